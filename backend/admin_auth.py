@@ -0,0 +1,26 @@
+"""
+Space Explorer admin authentication
+Shared-secret check for operator-only endpoints and headers
+"""
+
+import hmac
+import os
+from typing import Optional
+
+from flask import abort, request
+
+# Operator secret; admin endpoints stay hidden (404) while it is unset
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+_ADMIN_TOKEN_BYTES = ADMIN_TOKEN.encode('utf-8')
+
+def admin_authorized(value: Optional[str]) -> bool:
+    """Constant-time check of a presented token against ADMIN_TOKEN; a missing one is unauthorized"""
+    if not ADMIN_TOKEN or not value:
+        return False
+    # compare_digest rejects non-ASCII str, which any client can put in a header, so compare bytes
+    return hmac.compare_digest(value.encode('utf-8'), _ADMIN_TOKEN_BYTES)
+
+def require_admin() -> None:
+    """404 unless the request carries X-Admin-Token, so the endpoint looks absent"""
+    if not admin_authorized(request.headers.get('X-Admin-Token')):
+        abort(404)
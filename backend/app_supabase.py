@@ -2,17 +2,28 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 from supabase import create_client, Client
 import os
-import bcrypt
 import jwt
 import datetime
-from functools import wraps
-from dotenv import load_dotenv
+from functools import partial, wraps
+from capture import init_capture
+from compression import init_compression
+from health import init_health, health_response, database_probe
+from lazy import DeferredStartup, load_env_file
+from log_pipeline import init_logging
+from passwords import init_passwords, hash_password, verify_password, needs_rehash, schedule_rehash
+from throttle import throttled
 
 # Load env
-load_dotenv()
+load_env_file(os.path.dirname(os.path.abspath(__file__)))
 
 app = Flask(__name__)
+# Probes and bcrypt calibration start with the server, not on import
+startup = DeferredStartup()
+startup.init_app(app)
 CORS(app)
+init_capture(app)
+init_compression(app)
+init_logging(app)
 
 SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY')
@@ -28,11 +39,8 @@ supabase_admin: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
 
 JWT_SECRET = os.getenv('JWT_SECRET', 'change_me_dev_only')
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(12)).decode('utf-8')
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+startup.add(init_passwords)
+startup.add(partial(init_health, database=database_probe(lambda: supabase.table('users').select('id').limit(1).execute())))
 
 def generate_token(user: dict) -> str:
     payload = {
@@ -59,9 +67,10 @@ def token_required(f):
 
 @app.get('/health')
 def health():
-    return jsonify({ 'success': True, 'message': 'OK' })
+    return health_response(request.args.get('mode'))
 
 @app.post('/api/auth/register')
+@throttled
 def register():
     body = request.get_json(force=True)
     name = (body.get('name') or '').strip()
@@ -113,6 +122,7 @@ def register():
     return jsonify({ 'success': True, 'data': { 'user': user, 'tokens': { 'accessToken': token } } }), 201
 
 @app.post('/api/auth/login')
+@throttled
 def login():
     body = request.get_json(force=True)
     email = (body.get('email') or '').strip().lower()
@@ -141,6 +151,11 @@ def login():
     if not verify_password(password, user['password_hash']):
         return jsonify({'success': False, 'message': 'Invalid email or password'}), 401
 
+    if needs_rehash(user['password_hash']):
+        schedule_rehash(user['id'], password, lambda new_hash: supabase_admin.table('users').update({
+            'password_hash': new_hash
+        }).eq('id', user['id']).execute())
+
     # Update last_login
     supabase_admin.table('users').update({
         'last_login': datetime.datetime.utcnow().isoformat(),
@@ -169,6 +184,7 @@ def me(decoded):
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
+    startup.start()
     app.run(host='0.0.0.0', port=port, debug=os.getenv('NODE_ENV') == 'development')
 
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Space Explorer column projection benchmark
+Bytes transferred and JSON decode time per request, select('*') vs named projections
+"""
+
+import json
+import sys
+import timeit
+
+from projections import PROJECTIONS
+
+SAMPLE_ROW = {
+    'id': '5f0c7a0e-1d52-4b8e-9a43-0d6c1f3b9a21',
+    'email': 'explorer@spaceexplorer.com',
+    'name': 'Space Explorer',
+    'password_hash': '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewdBPj4J/8K5Q5K2',
+    'is_active': True,
+    'created_at': '2024-01-01T00:00:00+00:00',
+    'updated_at': '2024-06-01T12:30:00+00:00',
+    'last_login': '2024-06-01T12:30:00+00:00',
+    'version': 3,
+    'profile_data': {
+        'avatar': 'https://cdn.spaceexplorer.com/avatars/5f0c7a0e.png',
+        'bio': 'Amateur astronomer charting the outer planets. ' * 6,
+        'preferences': {
+            'theme': 'space',
+            'notifications': True,
+            'language': 'en',
+            'roles': ['user'],
+            'favorite_planets': ['jupiter', 'mars', 'mercury'],
+            'dashboard': {'widgets': ['iss-tracker', 'moon-phase', 'launches'], 'layout': 'grid'}
+        }
+    }
+}
+
+def wire_body(cols) -> bytes:
+    """PostgREST response body for one row restricted to the given columns"""
+    row = SAMPLE_ROW if cols is None else {col: SAMPLE_ROW[col] for col in cols}
+    return json.dumps([row], separators=(',', ':')).encode('utf-8')
+
+def decode_us(body: bytes, number: int) -> float:
+    return min(timeit.repeat(lambda: json.loads(body), number=number, repeat=5)) / number * 1e6
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    full = wire_body(None)
+    full_us = decode_us(full, number)
+
+    print('📦 Column projection benchmark (one row per request)')
+    print('=' * 72)
+    print(f"{'request':<22}{'bytes':>8}{'saved':>8}{'decode us':>12}{'saved us':>10}")
+    print(f"{'select(*)':<22}{len(full):>8}{0:>8}{full_us:>12.2f}{0:>10.2f}")
+    for name in ('login', 'me', 'profile', 'exists'):
+        body = wire_body(PROJECTIONS[name])
+        us = decode_us(body, number)
+        print(f'{name:<22}{len(body):>8}{len(full) - len(body):>8}{us:>12.2f}{full_us - us:>10.2f}')
+
+    # A failed login now stops after the credential fetch; the old path moved the full row twice
+    login_bytes = len(wire_body(PROJECTIONS['login']))
+    print('-' * 72)
+    print(f'failed login: {login_bytes} bytes instead of {len(full)}')
+    print(f"successful login (cold cache): {login_bytes + len(wire_body(PROJECTIONS['me']))} bytes "
+          f'instead of {2 * len(full)} (select * plus update representation)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Space Explorer response serialization microbenchmark
+Compares jsonify against the fast encoder, pre-encoded errors and cached user bodies
+"""
+
+import json
+import sys
+import timeit
+
+from flask import Flask, jsonify
+
+import responses
+from profile_cache import ProfileCache
+from user_record import UserRecord
+
+SAMPLE_USER = {
+    'id': '5f0c7a0e-1d52-4b8e-9a43-0d6c1f3b9a21',
+    'email': 'explorer@spaceexplorer.com',
+    'name': 'Space Explorer',
+    'is_active': True,
+    'created_at': '2024-01-01T00:00:00+00:00',
+    'updated_at': '2024-06-01T12:30:00+00:00',
+    'last_login': '2024-06-01T12:30:00+00:00',
+    'profile_data': {
+        'avatar': None,
+        'bio': 'Charting the outer planets',
+        'preferences': {
+            'theme': 'space',
+            'notifications': True,
+            'language': 'en',
+            'roles': ['user']
+        }
+    }
+}
+
+def me_payload(user) -> dict:
+    return {'success': True, 'data': {'user': user}}
+
+def measure(label: str, baseline, candidate, number: int) -> None:
+    """Time both callables and print per-call cost and speedup"""
+    base = min(timeit.repeat(baseline, number=number, repeat=5)) / number * 1e6
+    fast = min(timeit.repeat(candidate, number=number, repeat=5)) / number * 1e6
+    print(f'{label:<28} baseline {base:8.2f} us   fast {fast:8.2f} us   x{base / fast:5.1f}')
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    app = Flask(__name__)
+    cache = ProfileCache(ttl=60)
+    user = UserRecord.from_row(SAMPLE_USER)
+    entry = cache.put(user)
+    # jsonify cannot encode a UserRecord, so the baselines serialize its dict form
+    user_dict = user.as_json()
+    error = {'success': False, 'message': 'Invalid email or password', 'code': 'INVALID_CREDENTIALS'}
+
+    print('⏱️  Response serialization microbenchmark')
+    print(f'JSON encoder: {responses.JSON_ENCODER}, {number} calls per sample')
+    print('=' * 78)
+
+    with app.app_context():
+        measure('static error body',
+                lambda: jsonify(error),
+                lambda: responses.INVALID_CREDENTIALS(),
+                number)
+        measure('user payload (encode)',
+                lambda: jsonify(me_payload(user_dict)),
+                lambda: responses.json_response(me_payload(user)),
+                number)
+        measure('user payload (cached body)',
+                lambda: jsonify(me_payload(user_dict)),
+                lambda: responses.body_response(entry.body('me', me_payload)),
+                number)
+
+    measure('dumps only',
+            lambda: json.dumps(me_payload(user_dict)).encode('utf-8'),
+            lambda: responses.dumps(me_payload(user)),
+            number)
+
+if __name__ == '__main__':
+    main()
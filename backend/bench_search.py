@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Space Explorer user search benchmark
+Seeds the local stand-in with synthetic users and times name/email searches,
+first as full scans and then with the stand-in's prefix indexes, both in the
+datastore alone and end to end through GET /api/admin/users/search.
+
+Usage:
+    python bench_search.py --users 1000000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import time
+import uuid
+
+from postgrest_standin import PREFIX_INDEXES, Store, start_standin
+
+FIRST_NAMES = ['Alice', 'Bob', 'Carla', 'Dmitri', 'Elena', 'Farah', 'Gustavo', 'Hana', 'Ivan', 'Jun',
+               'Kwame', 'Lena', 'Mateo', 'Nadia', 'Oscar', 'Priya', 'Quinn', 'Rosa', 'Sven', 'Tariq',
+               'Uma', 'Victor', 'Wen', 'Ximena', 'Yusuf', 'Zoe']
+LAST_NAMES = ['Armstrong', 'Bean', 'Collins', 'Duke', 'Eisele', 'Foale', 'Glenn', 'Hadfield', 'Irwin',
+              'Jemison', 'Kelly', 'Leonov', 'McCandless', 'Nyberg', 'Ochoa', 'Peake', 'Ride', 'Shepard',
+              'Tereshkova', 'Volkov', 'Whitson', 'Young']
+
+# (label, q, match): prefix terms of falling selectivity, then substring scans
+QUERIES = [
+    ('email prefix, unique', 'alice.armstrong.123', 'prefix'),
+    ('email prefix, 1 in 26', 'a', 'prefix'),
+    ('name prefix, common', 'zoe s', 'prefix'),
+    ('name prefix, no match', 'qqq', 'prefix'),
+    ('substring, common', 'ride', 'substring'),
+    ('substring, rare', 'ride.9999', 'substring'),
+]
+
+def seed(store: Store, count: int, batch: int = 50000) -> None:
+    """Insert count users straight into the stand-in's SQLite tables"""
+    rng = random.Random(7)
+    stamp = '2024-06-01T12:30:00+00:00'
+    sql = ('INSERT INTO users (id, email, name, password_hash, is_active, created_at, updated_at, version) '
+           'VALUES (?, ?, ?, ?, 1, ?, ?, 1)')
+    with store.lock:
+        for start in range(0, count, batch):
+            rows = []
+            for i in range(start, min(start + batch, count)):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                rows.append((str(uuid.UUID(int=rng.getrandbits(128))), f'{first}.{last}.{i}@example.com'.lower(),
+                             f'{first} {last}', 'x', stamp, stamp))
+            store.conn.execute('BEGIN')
+            store.conn.executemany(sql, rows)
+            store.conn.execute('COMMIT')
+
+def add_prefix_indexes(store: Store) -> float:
+    """Build the prefix indexes on an already seeded store; returns seconds"""
+    started = time.perf_counter()
+    with store.lock:
+        for table, cols in PREFIX_INDEXES.items():
+            for col in cols:
+                store.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{col}_prefix ON {table} ("{col}")')
+                store.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{col}_lower ON {table} (lower("{col}"))')
+    store.prefix_indexes = True
+    return time.perf_counter() - started
+
+def percentiles(samples: list) -> tuple:
+    samples = sorted(samples)
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1 if len(samples) > 1 else 0]
+
+def time_store(store: Store, pattern: str, runs: int) -> tuple:
+    """Milliseconds for the select the endpoint issues, datastore only"""
+    filters = [('or', f'(email.like.{pattern},name.ilike.{pattern})')]
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        store.select('users', 'id,email,name,is_active,created_at,last_login', filters, 'email', 21)
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+def time_endpoint(client, term: str, match: str, runs: int) -> tuple:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = client.get(f'/api/admin/users/search?q={term}&match={match}',
+                              headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']})
+        samples.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, response.data
+    return percentiles(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='User search latency at scale')
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    store = Store(prefix_indexes=False)
+    server = start_standin(store=store)
+    os.environ.update(SUPABASE_URL=server.url, ADMIN_TOKEN=os.getenv('ADMIN_TOKEN') or 'bench', LOG_LEVEL='ERROR')
+    import app
+    client = app.app.test_client()
+    patterns = {label: app.search_pattern(term, match) for label, term, match in QUERIES}
+
+    started = time.perf_counter()
+    seed(store, args.users)
+    print(f'🔎 User search benchmark ({args.users:,} users, seeded in {time.perf_counter() - started:.1f}s)')
+
+    scans = {label: time_store(store, patterns[label], max(3, args.runs // 5)) for label, _, _ in QUERIES}
+    print(f'prefix indexes built in {add_prefix_indexes(store):.1f}s')
+    indexed = {label: time_store(store, patterns[label], args.runs) for label, _, _ in QUERIES}
+    endpoint = {label: time_endpoint(client, term, match, args.runs) for label, term, match in QUERIES}
+
+    print('=' * 86)
+    print(f"{'query':<24}{'scan p50':>11}{'index p50':>11}{'index p95':>11}{'endpoint p50':>15}{'endpoint p95':>14}")
+    for label, _, _ in QUERIES:
+        print(f'{label:<24}{scans[label][0]:>9.1f}ms{indexed[label][0]:>9.1f}ms{indexed[label][1]:>9.1f}ms'
+              f'{endpoint[label][0]:>13.1f}ms{endpoint[label][1]:>12.1f}ms')
+    print('-' * 86)
+    print('substring matches scan in the stand-in; Postgres serves them from the pg_trgm indexes in schema.sql')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Space Explorer startup benchmark
+Starts fresh interpreters that import an app module against the local stand-in
+and times the import, the first /health response and the first database-backed
+response (/api/auth/me for a seeded user).
+
+Usage:
+    python bench_startup.py --app app --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import requests
+
+from postgrest_standin import start_standin
+
+# Runs in each fresh interpreter; prints one JSON line of timings in milliseconds
+CHILD = r'''
+import json, os, sys, time
+started = time.perf_counter()
+module = __import__(sys.argv[1])
+imported = time.perf_counter()
+client = module.app.test_client()
+health = client.get('/health')
+first_health = time.perf_counter()
+me = client.get('/api/auth/me', headers={'Authorization': 'Bearer ' + os.environ['BENCH_TOKEN']})
+first_db = time.perf_counter()
+assert health.status_code == 200 and me.status_code == 200, (health.status_code, me.status_code, me.data)
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_health_ms': (first_health - started) * 1000,
+    'first_db_response_ms': (first_db - started) * 1000
+}))
+'''
+
+def seed_user(standin_url: str) -> dict:
+    """Insert a user straight into the stand-in; no bcrypt work is needed for /me"""
+    response = requests.post(f'{standin_url}/rest/v1/users',
+                             json={'name': 'Startup', 'email': 'startup@spaceexplorer.com', 'password_hash': 'x'},
+                             headers={'Prefer': 'return=representation'})
+    response.raise_for_status()
+    return response.json()[0]
+
+def make_token(user: dict) -> str:
+    import jwt
+    secret = os.getenv('JWT_SECRET', 'space_explorer_jwt_secret_key_2024_secure_token')
+    return jwt.encode({'userId': user['id'], 'email': user['email'], 'name': user['name'],
+                       'exp': int(time.time()) + 3600}, secret, algorithm='HS256')
+
+def run_child(module: str, env: dict) -> dict:
+    started = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD, module], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    wall_ms = (time.perf_counter() - started) * 1000
+    lines = [line for line in output.stdout.splitlines() if line.startswith('{"import_ms"')]
+    if output.returncode != 0 or not lines:
+        raise RuntimeError(f'{module} failed to start:\n{output.stderr[-2000:]}')
+    return {**json.loads(lines[-1]), 'process_wall_ms': wall_ms}
+
+def main():
+    parser = argparse.ArgumentParser(description='Import time and time to first response')
+    parser.add_argument('--app', action='append', choices=('app', 'app_simple'),
+                        help='app module to measure (repeatable, default both)')
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--calibrate', action='store_true',
+                        help='let bcrypt calibrate at startup instead of pinning BCRYPT_ROUNDS')
+    args = parser.parse_args()
+
+    standin = start_standin()
+    token = make_token(seed_user(standin.url))
+    env = {**os.environ, 'SUPABASE_URL': standin.url, 'BENCH_TOKEN': token,
+           'LOG_LEVEL': 'WARNING', 'HEALTH_PROBE_INTERVAL': '3600'}
+    if not args.calibrate:
+        env.setdefault('BCRYPT_ROUNDS', '10')
+
+    print('⏱️  Space Explorer startup benchmark')
+    print('=' * 78)
+    print(f"{'app':<12}{'import ms':>12}{'1st health':>12}{'1st db resp':>13}{'process':>11}")
+    for module in args.app or ['app', 'app_simple']:
+        runs = [run_child(module, env) for _ in range(args.runs)]
+        median = {key: statistics.median(run[key] for run in runs)
+                  for key in ('import_ms', 'first_health_ms', 'first_db_response_ms', 'process_wall_ms')}
+        print(f"{module:<12}{median['import_ms']:>12.1f}{median['first_health_ms']:>12.1f}"
+              f"{median['first_db_response_ms']:>13.1f}{median['process_wall_ms']:>11.1f}")
+    print(f'(medians of {args.runs} fresh interpreters; times measured from the start of the import)')
+
+if __name__ == '__main__':
+    sys.exit(main())
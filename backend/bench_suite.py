@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Space Explorer benchmark suite with regression gates
+Times the shared primitives and each route (Flask test client + local stand-in),
+compares against JSON baselines and exits non-zero on regressions.
+
+Usage:
+    python bench_suite.py                      # compare against bench_baseline.json
+    python bench_suite.py --update-baseline    # record new baselines on this host
+    python bench_suite.py --only route_ --threshold 0.3
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import closing, contextmanager
+from pathlib import Path
+
+# Pin the cost so hash timings compare across runs instead of following calibration
+os.environ.setdefault('BCRYPT_ROUNDS', '10')
+# Route benchmarks replay the same login from one address; throttling would turn them into 429s
+os.environ.setdefault('THROTTLE_ENABLED', 'false')
+
+BASELINE_PATH = Path(__file__).with_name('bench_baseline.json')
+BENCHMARKS = {}
+
+def benchmark(name: str, number: int = 1000):
+    """Register a benchmark; the decorated factory returns the callable to time"""
+    def register(factory):
+        BENCHMARKS[name] = (factory, number)
+        return factory
+    return register
+
+@contextmanager
+def prepared(factory):
+    """The callable to time; a generator factory keeps its setup (e.g. a pushed context) open until timing ends"""
+    made = factory()
+    if inspect.isgenerator(made):
+        with closing(made):
+            yield next(made)
+    else:
+        yield made
+
+def measure(fn, number: int, repeat: int = 5) -> dict:
+    """Median per-call latency and peak bytes allocated by a single call"""
+    fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+
+    tracemalloc.start()
+    peak = 0
+    for _ in range(3):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+    return {'median_us': round(statistics.median(samples), 3), 'alloc_peak_bytes': peak}
+
+# Context shared by the route benchmarks
+
+class Context:
+    app_module = None
+    client = None
+    token = None
+    user = {'id': '5f0c7a0e-1d52-4b8e-9a43-0d6c1f3b9a21', 'email': 'bench@spaceexplorer.com', 'name': 'Bench'}
+    password = 'BenchPass123!'
+
+    @classmethod
+    def app(cls):
+        if cls.app_module is None:
+            from postgrest_standin import start_standin
+            os.environ['SUPABASE_URL'] = start_standin().url
+            import logging
+            import app as app_module
+            for name in ('httpx', 'access'):
+                logging.getLogger(name).setLevel(logging.WARNING)
+            cls.app_module = app_module
+            cls.client = app_module.app.test_client()
+            cls.client.post('/api/auth/register', json={'name': 'Bench', 'email': cls.user['email'], 'password': cls.password})
+            login = cls.client.post('/api/auth/login', json={'email': cls.user['email'], 'password': cls.password})
+            cls.token = login.get_json()['data']['tokens']['accessToken']
+        return cls.app_module
+
+    @classmethod
+    def auth(cls) -> dict:
+        return {'Authorization': f'Bearer {cls.token}'}
+
+# Primitives
+
+@benchmark('hash_password', number=5)
+def _hash_password():
+    from passwords import hash_password
+    return lambda: hash_password(Context.password)
+
+@benchmark('verify_password', number=5)
+def _verify_password():
+    from passwords import hash_password, verify_password
+    hashed = hash_password(Context.password)
+    return lambda: verify_password(Context.password, hashed)
+
+@benchmark('generate_token', number=2000)
+def _generate_token():
+    generate_token = Context.app().generate_token
+    return lambda: generate_token(Context.user)
+
+@benchmark('verify_token', number=2000)
+def _verify_token():
+    module = Context.app()
+    token = module.generate_token(Context.user)
+    return lambda: module.verify_token(token)
+
+@benchmark('token_required_overhead', number=2000)
+def _token_required():
+    module = Context.app()
+    view = module.token_required(lambda current_user_id: current_user_id)
+    with module.app.test_request_context(headers=Context.auth()):
+        yield view
+
+@benchmark('serialize_me_payload', number=5000)
+def _serialize():
+    from responses import dumps
+    module = Context.app()
+    user = module.me_entry(module.verify_token(Context.token)['userId']).user
+    return lambda: dumps(module.me_payload(user))
+
+@benchmark('static_error_response', number=5000)
+def _static_error():
+    from responses import INVALID_CREDENTIALS
+    with Context.app().app.app_context():
+        yield INVALID_CREDENTIALS
+
+@benchmark('throttle_take', number=5000)
+def _throttle_take():
+    from throttle import IP_LIMIT, MemoryBucketStore
+    store = MemoryBucketStore()
+    keys = [f'ip:10.0.{i // 256}.{i % 256}' for i in range(10000)]
+    cursor = iter(range(1 << 62))
+    return lambda: store.take(keys[next(cursor) % len(keys)], IP_LIMIT)
+
+# Routes
+
+@benchmark('route_health', number=300)
+def _route_health():
+    client = Context.app() and Context.client
+    return lambda: client.get('/health')
+
+@benchmark('route_me_cached', number=300)
+def _route_me_cached():
+    client = Context.app() and Context.client
+    return lambda: client.get('/api/auth/me', headers=Context.auth())
+
+@benchmark('route_me_uncached', number=100)
+def _route_me_uncached():
+    module = Context.app()
+
+    def call():
+        module.profile_cache.clear()
+        Context.client.get('/api/auth/me', headers=Context.auth())
+    return call
+
+@benchmark('route_me_not_modified', number=300)
+def _route_me_304():
+    client = Context.app() and Context.client
+    etag = client.get('/api/auth/me', headers=Context.auth()).headers['ETag']
+    return lambda: client.get('/api/auth/me', headers={**Context.auth(), 'If-None-Match': etag})
+
+@benchmark('route_profile', number=300)
+def _route_profile():
+    client = Context.app() and Context.client
+    return lambda: client.get('/api/users/profile', headers=Context.auth())
+
+@benchmark('route_update_profile', number=50)
+def _route_update():
+    client = Context.app() and Context.client
+    return lambda: client.put('/api/users/profile', headers=Context.auth(), json={'profile_data': {'bio': 'bench'}})
+
+@benchmark('route_login', number=5)
+def _route_login():
+    client = Context.app() and Context.client
+    body = {'email': Context.user['email'], 'password': Context.password}
+    return lambda: client.post('/api/auth/login', json=body)
+
+@benchmark('route_login_bad_password', number=5)
+def _route_login_bad():
+    client = Context.app() and Context.client
+    body = {'email': Context.user['email'], 'password': 'wrong-password'}
+    return lambda: client.post('/api/auth/login', json=body)
+
+def compare(results: dict, baseline: dict, threshold: float, alloc_threshold: float, slack_us: float) -> list:
+    """Names and reasons of benchmarks that regressed beyond the thresholds"""
+    failures = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = previous['median_us'] * (1 + threshold) + slack_us
+        if current['median_us'] > limit:
+            failures.append(f"{name}: {current['median_us']:.1f} us > {previous['median_us']:.1f} us baseline")
+        alloc_limit = previous['alloc_peak_bytes'] * (1 + alloc_threshold) + 1024
+        if current['alloc_peak_bytes'] > alloc_limit:
+            failures.append(f"{name}: {current['alloc_peak_bytes']} B peak > {previous['alloc_peak_bytes']} B baseline")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Space Explorer benchmark suite')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH))
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--only', default='', help='run benchmarks whose name starts with this prefix')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed latency regression (0.25 = +25%%)')
+    parser.add_argument('--alloc-threshold', type=float, default=0.25, help='allowed peak allocation regression')
+    parser.add_argument('--slack-us', type=float, default=2.0, help='absolute latency slack for tiny benchmarks')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply iteration counts')
+    args = parser.parse_args()
+
+    baseline_file = Path(args.baseline)
+    stored = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    baseline = stored.get('benchmarks', {})
+
+    print('🏁 Space Explorer benchmark suite')
+    print('=' * 78)
+    print(f"{'benchmark':<28}{'median us':>12}{'baseline':>12}{'delta':>9}{'peak alloc':>13}")
+    results = {}
+    for name, (factory, number) in BENCHMARKS.items():
+        if not name.startswith(args.only):
+            continue
+        with prepared(factory) as fn:
+            results[name] = measure(fn, max(1, int(number * args.scale)))
+        previous = baseline.get(name)
+        delta = f"{(results[name]['median_us'] / previous['median_us'] - 1) * 100:+.0f}%" if previous else 'new'
+        base_us = f"{previous['median_us']:.1f}" if previous else '-'
+        print(f"{name:<28}{results[name]['median_us']:>12.1f}{base_us:>12}{delta:>9}"
+              f"{results[name]['alloc_peak_bytes']:>11} B")
+
+    if args.update_baseline:
+        baseline.update(results)
+        baseline_file.write_text(json.dumps({
+            'host': {'python': platform.python_version(), 'machine': platform.machine(),
+                     'bcrypt_rounds': int(os.environ['BCRYPT_ROUNDS'])},
+            'benchmarks': baseline
+        }, indent=2, sort_keys=True) + '\n')
+        print(f'\n💾 Baseline written to {baseline_file}')
+        return 0
+
+    failures = compare(results, baseline, args.threshold, args.alloc_threshold, args.slack_us)
+    if failures:
+        print('\n❌ Regressions beyond threshold:')
+        for failure in failures:
+            print(f'   {failure}')
+        return 1
+    print('\n✅ No regressions')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Space Explorer user record benchmark
+Per-entry memory and serialization time of cached users, plain dicts vs UserRecord
+"""
+
+import gc
+import json
+import sys
+import timeit
+import tracemalloc
+
+from bench_projection import SAMPLE_ROW
+from projections import PROJECTIONS
+from responses import JSON_ENCODER, dumps
+from user_record import UserRecord
+
+def wire_rows(count: int) -> bytes:
+    """PostgREST body of `count` distinct users in the login/register row shape"""
+    rows = [dict(SAMPLE_ROW, id=f'{i:08d}-1d52-4b8e-9a43-0d6c1f3b9a21', email=f'explorer{i}@spaceexplorer.com')
+            for i in range(count)]
+    return json.dumps(rows).encode('utf-8')
+
+def retained_bytes(build) -> int:
+    """Bytes still allocated after build() returns, with its result kept alive"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+def as_dicts(body: bytes) -> list:
+    rows = json.loads(body)
+    for row in rows:
+        del row['password_hash']
+    return rows
+
+def as_records(body: bytes) -> list:
+    return [UserRecord.from_row(row) for row in json.loads(body)]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    number = 20000
+    body = wire_rows(count)
+
+    dict_bytes = retained_bytes(lambda: as_dicts(body)) / count
+    record_bytes = retained_bytes(lambda: as_records(body)) / count
+
+    row = {column: SAMPLE_ROW[column] for column in PROJECTIONS['me']}
+    record = UserRecord.from_row(SAMPLE_ROW)
+    assert dumps(record) == dumps(row)
+    dict_us = min(timeit.repeat(lambda: dumps({'success': True, 'data': {'user': row}}), number=number, repeat=5)) / number * 1e6
+    record_us = min(timeit.repeat(lambda: dumps({'success': True, 'data': {'user': record}}), number=number, repeat=5)) / number * 1e6
+    convert_us = min(timeit.repeat(lambda: UserRecord.from_row(SAMPLE_ROW), number=number, repeat=5)) / number * 1e6
+
+    print(f'🧾 User record benchmark ({count} cached users, {JSON_ENCODER} encoder)')
+    print('=' * 66)
+    print(f"{'':<16}{'bytes/entry':>14}{'me body us':>14}")
+    print(f"{'dict':<16}{dict_bytes:>14.0f}{dict_us:>14.2f}")
+    print(f"{'UserRecord':<16}{record_bytes:>14.0f}{record_us:>14.2f}")
+    print('-' * 66)
+    print(f'memory saved: {dict_bytes - record_bytes:.0f} B/entry '
+          f'({(1 - record_bytes / dict_bytes) * 100:.0f}%), {(dict_bytes - record_bytes) * count / 1e6:.1f} MB at {count} users')
+    print(f'row -> UserRecord conversion: {convert_us:.2f} us (once per fetch)')
+    print('me/profile bodies are encoded once per cache entry, so the slower encode is paid once, not per request')
+
+if __name__ == '__main__':
+    main()
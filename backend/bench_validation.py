@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Space Explorer request validation benchmark
+Times malformed register and login requests against the local stand-in twice:
+once with the schema check bypassed, as the routes ran before (each request
+reaches the database and often bcrypt before failing), and once through the
+compiled schemas, which answer 400 without any I/O.
+
+Usage:
+    python bench_validation.py --runs 20
+    python bench_validation.py --app app_simple
+"""
+
+import argparse
+import importlib
+import itertools
+import os
+import statistics
+import time
+
+from postgrest_standin import start_standin
+
+_seq = itertools.count()
+
+def unique_email() -> str:
+    return f'bench.validation.{next(_seq)}@example.com'
+
+# (label, route, body factory): one kind of malformed request each
+CASES = [
+    ('register, bad email', '/api/auth/register',
+     lambda: {'name': 'Bench', 'email': f'not-an-email-{next(_seq)}', 'password': 'BenchPass123!'}),
+    ('register, long name', '/api/auth/register',
+     lambda: {'name': 'N' * 500, 'email': unique_email(), 'password': 'BenchPass123!'}),
+    ('register, long password', '/api/auth/register',
+     lambda: {'name': 'Bench', 'email': unique_email(), 'password': 'p' * 100}),
+    ('register, numeric name', '/api/auth/register',
+     lambda: {'name': 42, 'email': unique_email(), 'password': 'BenchPass123!'}),
+    ('login, bad email', '/api/auth/login',
+     lambda: {'email': 'bench.validation.0', 'password': 'BenchPass123!'}),
+    ('login, numeric password', '/api/auth/login',
+     lambda: {'email': 'bench.validation.0@example.com', 'password': 12345678}),
+]
+
+def unvalidated(view):
+    """The view below its validated() wrapper, i.e. the route as it ran before schemas"""
+    # Outer wrappers copy the schema attribute too, so look for the innermost view carrying it
+    while hasattr(view, 'schema'):
+        inner = view.__wrapped__
+        if not hasattr(inner, 'schema'):
+            return inner
+        view = inner
+    raise LookupError('view has no validated() wrapper')
+
+def time_case(client, route: str, body, runs: int) -> tuple:
+    samples, statuses = [], set()
+    for _ in range(runs):
+        payload = body()
+        started = time.perf_counter()
+        response = client.post(route, json=payload)
+        samples.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+    return statistics.median(samples), sorted(statuses)
+
+def time_check(schema, body: dict, number: int = 20000) -> float:
+    """Microseconds to validate one body that passes"""
+    started = time.perf_counter()
+    for _ in range(number):
+        schema.validate(body)
+    return (time.perf_counter() - started) / number * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description='Wasted work avoided by request validation')
+    parser.add_argument('--app', default='app', choices=['app', 'app_simple'])
+    parser.add_argument('--runs', type=int, default=20)
+    args = parser.parse_args()
+
+    server = start_standin()
+    os.environ.update(SUPABASE_URL=server.url, BCRYPT_ROUNDS=os.getenv('BCRYPT_ROUNDS', '10'),
+                      THROTTLE_ENABLED='false', LOG_LEVEL='CRITICAL')
+    module = importlib.import_module(args.app)
+    client = module.app.test_client()
+    validated_views = dict(module.app.view_functions)
+    before_views = {endpoint: unvalidated(validated_views[endpoint]) for endpoint in ('register', 'login')}
+
+    results = {}
+    for label, route, body in CASES:
+        endpoint = route.rsplit('/', 1)[1]
+        module.app.view_functions[endpoint] = before_views[endpoint]
+        before = time_case(client, route, body, args.runs)
+        module.app.view_functions[endpoint] = validated_views[endpoint]
+        after = time_case(client, route, body, args.runs)
+        results[label] = (before, after)
+
+    from validation import LOGIN, REGISTER
+    register_us = time_check(REGISTER, {'name': 'Bench', 'email': 'bench@example.com', 'password': 'BenchPass123!'})
+    login_us = time_check(LOGIN, {'email': 'bench@example.com', 'password': 'BenchPass123!'})
+
+    print(f'🧾 Request validation benchmark ({args.app}, {args.runs} runs, bcrypt cost {os.environ["BCRYPT_ROUNDS"]})')
+    print('=' * 78)
+    print(f"{'request':<26}{'before p50':>12}{'status':>12}{'after p50':>12}{'status':>8}{'saved':>8}")
+    for label, ((before_ms, before_status), (after_ms, after_status)) in results.items():
+        saved = 1 - after_ms / before_ms if before_ms else 0.0
+        print(f'{label:<26}{before_ms:>10.2f}ms{"/".join(map(str, before_status)):>12}'
+              f'{after_ms:>10.2f}ms{"/".join(map(str, after_status)):>8}{saved:>8.0%}')
+    print('-' * 78)
+    print(f'schema check on a valid body: register {register_us:.1f} us, login {login_us:.1f} us')
+
+if __name__ == '__main__':
+    main()
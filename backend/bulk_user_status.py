@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Space Explorer bulk account deactivation and reactivation
+Flips users.is_active for a streamed list of ids or emails, or for every user
+matching PostgREST filters, in batched `in` updates on every shard. Only one
+batch is held in memory at a time, so a sweep over millions of users runs in
+constant memory.
+
+Per batch the job selects the users whose status actually changes, updates
+them by id and, when deactivating, deletes their user_sessions (refresh
+tokens). It then asks each --invalidate-url app host to drop them from the
+caches of its workers. Progress is checkpointed to --state after every batch; run
+again with --resume to continue an interrupted sweep where it stopped.
+
+Usage:
+    python bulk_user_status.py deactivate --ids ids.txt --state sweep.json
+    zcat emails.gz | python bulk_user_status.py deactivate --emails - --state sweep.json
+    python bulk_user_status.py deactivate --filter last_login=lt.2023-01-01 --filter is_active=eq.true
+    python bulk_user_status.py reactivate --ids ids.txt --state sweep.json --resume
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+
+from sharding import SUPABASE_SHARDS, normalize_email
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+# PostgREST Prefer: return=minimal (postgrest.types.ReturnMethod.minimal)
+RETURN_MINIMAL = 'minimal'
+
+def create_client(url: str):
+    from supabase import create_client
+    return create_client(url, SUPABASE_SERVICE_KEY)
+
+def read_values(path: str, skip: int) -> Iterator[str]:
+    """Stripped lines of a file ('-' for stdin), after the first skip lines"""
+    source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in islice(source, skip, None):
+            yield line.strip()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def batched(values: Iterator[str], size: int) -> Iterator[List[str]]:
+    """Lists of up to size values; blank lines still count so line offsets stay exact"""
+    batch = []
+    for value in values:
+        batch.append(value)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def parse_filters(specs: List[str]) -> List[tuple]:
+    """col=op.value pairs, as PostgREST takes them in the query string"""
+    filters = []
+    for spec in specs:
+        column, sep, expr = spec.partition('=')
+        if not sep or '.' not in expr:
+            raise ValueError(f'filter must look like column=op.value: {spec}')
+        filters.append((column.strip(), expr.strip()))
+    return filters
+
+class Checkpoint:
+    """Resumable position of a sweep, rewritten atomically after every batch"""
+
+    def __init__(self, path: Optional[str], job: dict):
+        self.path = path
+        self.job = job
+        self.position = {'lines': 0, 'after_id': None}
+        self.totals = {'seen': 0, 'changed': 0, 'sessions_deleted': 0}
+
+    def load(self) -> None:
+        with open(self.path, encoding='utf-8') as f:
+            state = json.load(f)
+        if state['job'] != self.job:
+            raise SystemExit(f'{self.path} belongs to a different sweep: {state["job"]}')
+        self.position, self.totals = state['position'], state['totals']
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'job': self.job, 'position': self.position, 'totals': self.totals}, f)
+        os.replace(tmp, self.path)
+
+class StatusSweep:
+    """Applies one batch of ids or emails to every shard"""
+
+    def __init__(self, clients: Dict[str, object], active: bool, invalidate_urls: List[str]):
+        self.clients = clients
+        self.active = active
+        self.invalidate_urls = invalidate_urls
+        self._session = None
+
+    def changing_ids(self, client, column: str, values: List[str]) -> List[str]:
+        """Ids of the users in the batch whose status differs from the target"""
+        rows = client.table('users').select('id').in_(column, values).eq('is_active', not self.active).execute().data
+        return [row['id'] for row in rows]
+
+    def apply(self, column: str, values: List[str], shards: Optional[List[str]] = None) -> tuple:
+        """(changed, sessions deleted) for one batch of ids or emails, on the given shards or all of them"""
+        changed, sessions = 0, 0
+        for name in shards or self.clients:
+            client = self.clients[name]
+            ids = self.changing_ids(client, column, values)
+            if not ids:
+                continue
+            # updated_at is set by the update_users_updated_at trigger
+            client.table('users').update({'is_active': self.active}, returning=RETURN_MINIMAL).in_('id', ids).execute()
+            if not self.active:
+                # Refresh tokens of deactivated users must not mint new access tokens
+                result = client.table('user_sessions').delete().in_('user_id', ids).execute()
+                sessions += len(result.data or [])
+            self.invalidate(ids)
+            changed += len(ids)
+        return changed, sessions
+
+    def invalidate(self, ids: List[str]) -> None:
+        """Drop the users from the caches (and, on deactivation, event streams) of every worker on the listed app hosts"""
+        if not self.invalidate_urls:
+            return
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+        for url in self.invalidate_urls:
+            response = self._session.post(url, json={'ids': ids, 'is_active': self.active},
+                                          headers={'X-Admin-Token': ADMIN_TOKEN}, timeout=10)
+            if response.status_code != 200:
+                print(f'cache invalidation at {url} failed: {response.status_code}', file=sys.stderr, flush=True)
+
+def scan_filter(client, filters: List[tuple], after_id: Optional[str], batch: int) -> Iterator[List[str]]:
+    """Ids matching the filters on one shard, keyset-paginated by id"""
+    while True:
+        query = client.table('users').select('id')
+        for column, expr in filters:
+            query = query.filter(column, *expr.split('.', 1))
+        if after_id is not None:
+            query = query.gt('id', after_id)
+        rows = query.order('id').limit(batch).execute().data
+        if rows:
+            yield [row['id'] for row in rows]
+        if len(rows) < batch:
+            return
+        after_id = rows[-1]['id']
+
+def run(sweep: StatusSweep, checkpoint: Checkpoint, args) -> None:
+    started = reported = time.monotonic()
+
+    def progress(final: bool = False) -> None:
+        nonlocal reported
+        if not final and time.monotonic() - reported < 5:
+            return
+        reported = time.monotonic()
+        totals = checkpoint.totals
+        rate = totals['seen'] / max(reported - started, 1e-9)
+        print(f"{'done' if final else 'progress'}: {totals['seen']} seen, {totals['changed']} "
+              f"{'reactivated' if sweep.active else 'deactivated'}, {totals['sessions_deleted']} sessions deleted "
+              f'({rate:.0f} users/s)', flush=True)
+
+    if args.filter:
+        filters = parse_filters(args.filter)
+        # Shards are swept one after the other; the position records which one and where
+        shards = list(sweep.clients)
+        position = checkpoint.position
+        for name in shards[shards.index(position.get('shard') or shards[0]):]:
+            after_id = position['after_id'] if position.get('shard') == name else None
+            for ids in scan_filter(sweep.clients[name], filters, after_id, args.batch):
+                changed, sessions = sweep.apply('id', ids, [name])
+                checkpoint.totals['seen'] += len(ids)
+                checkpoint.totals['changed'] += changed
+                checkpoint.totals['sessions_deleted'] += sessions
+                checkpoint.position = {'shard': name, 'after_id': ids[-1], 'lines': 0}
+                checkpoint.save()
+                progress()
+                if args.pause:
+                    time.sleep(args.pause)
+    else:
+        column, path = ('email', args.emails) if args.emails else ('id', args.ids)
+        for lines in batched(read_values(path, checkpoint.position['lines']), args.batch):
+            values = [normalize_email(value) if column == 'email' else value for value in lines if value]
+            changed, sessions = sweep.apply(column, values) if values else (0, 0)
+            checkpoint.totals['seen'] += len(values)
+            checkpoint.totals['changed'] += changed
+            checkpoint.totals['sessions_deleted'] += sessions
+            checkpoint.position['lines'] += len(lines)
+            checkpoint.save()
+            progress()
+            if args.pause:
+                time.sleep(args.pause)
+    progress(final=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Deactivate or reactivate users in bulk')
+    parser.add_argument('action', choices=('deactivate', 'reactivate'))
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--ids', help="file of user ids, one per line ('-' for stdin)")
+    source.add_argument('--emails', help="file of emails, one per line ('-' for stdin)")
+    source.add_argument('--filter', action='append', help='PostgREST filter on users, e.g. last_login=lt.2023-01-01')
+    parser.add_argument('--batch', type=int, default=500, help='users per in (...) statement')
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between batches')
+    parser.add_argument('--state', help='checkpoint file, rewritten after every batch')
+    parser.add_argument('--resume', action='store_true', help='continue from the position in --state')
+    parser.add_argument('--invalidate-url', action='append', default=[],
+                        help='POST /api/admin/users/invalidate of a running app host (repeatable)')
+    args = parser.parse_args()
+
+    if not SUPABASE_SERVICE_KEY or not (SUPABASE_URL or SUPABASE_SHARDS):
+        sys.exit('SUPABASE_URL (or SUPABASE_SHARDS) and SUPABASE_SERVICE_ROLE_KEY must be set')
+    if args.resume and not args.state:
+        sys.exit('--resume needs --state')
+    if args.resume and '-' in (args.ids, args.emails):
+        print('resuming from stdin: the same input must be piped in again', file=sys.stderr)
+
+    urls = SUPABASE_SHARDS or {'default': SUPABASE_URL}
+    clients = {name: create_client(url) for name, url in urls.items()}
+    job = {'action': args.action, 'ids': args.ids, 'emails': args.emails, 'filter': args.filter, 'shards': sorted(urls)}
+    checkpoint = Checkpoint(args.state, job)
+    if args.resume:
+        checkpoint.load()
+        print(f"resuming after {checkpoint.totals['seen']} users", flush=True)
+
+    sweep = StatusSweep(clients, args.action == 'reactivate', args.invalidate_url)
+    run(sweep, checkpoint, args)
+
+if __name__ == '__main__':
+    main()
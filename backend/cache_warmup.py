@@ -0,0 +1,87 @@
+"""
+Space Explorer profile cache warm-up
+Streams the most recently active users into the profile cache after startup so
+the first wave of /me and profile requests does not all reach the database.
+Runs in the background: liveness is unaffected and readiness waits for it.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from health import health_monitor
+from metrics import metrics
+from profile_cache import PROFILE_CACHE_SIZE, profile_cache
+from user_record import UserRecord
+
+logger = logging.getLogger(__name__)
+
+CACHE_WARMUP_ENABLED = os.getenv('CACHE_WARMUP_ENABLED', 'false').lower() == 'true'
+CACHE_WARMUP_COUNT = int(os.getenv('CACHE_WARMUP_COUNT', '1000'))
+CACHE_WARMUP_BUDGET_S = float(os.getenv('CACHE_WARMUP_BUDGET_S', '10'))
+CACHE_WARMUP_BATCH = int(os.getenv('CACHE_WARMUP_BATCH', '200'))
+
+# fetch_page(cursor, limit): records of users with last_login < cursor (or any non-null
+# last_login when cursor is None), newest first
+FetchPage = Callable[[Optional[str], int], List[UserRecord]]
+
+class WarmupState:
+    __slots__ = ('state', 'warmed', 'elapsed_ms', 'error')
+
+    def __init__(self):
+        self.state = 'pending'
+        self.warmed = 0
+        self.elapsed_ms = 0.0
+        self.error = None
+
+warmup_state = WarmupState()
+
+def warm_profile_cache(fetch_page: FetchPage, count: int = CACHE_WARMUP_COUNT,
+                       budget_s: float = CACHE_WARMUP_BUDGET_S, batch: int = CACHE_WARMUP_BATCH) -> int:
+    """Load up to count recently active users within the time budget; returns how many"""
+    started = time.monotonic()
+    deadline = started + budget_s
+    count = min(count, PROFILE_CACHE_SIZE)
+    cursor, warmed = None, 0
+    while warmed < count and time.monotonic() < deadline:
+        limit = min(batch, count - warmed)
+        rows = fetch_page(cursor, limit)
+        for row in rows:
+            profile_cache.put(row)
+        warmed += len(rows)
+        warmup_state.warmed = warmed
+        warmup_state.elapsed_ms = (time.monotonic() - started) * 1000
+        if len(rows) < limit:
+            break
+        # Keyset pagination walks idx_users_last_login backwards without OFFSET scans
+        cursor = rows[-1].last_login
+    return warmed
+
+def _run(fetch_page: FetchPage) -> None:
+    warmup_state.state = 'running'
+    try:
+        warm_profile_cache(fetch_page)
+        warmup_state.state = 'done'
+        logger.info('Profile cache warmed with %d users in %.0f ms', warmup_state.warmed, warmup_state.elapsed_ms)
+    except Exception as e:
+        # A failed warm-up leaves a colder cache, not an unready worker
+        warmup_state.state, warmup_state.error = 'failed', str(e)
+        logger.warning('Profile cache warm-up failed after %d users: %s', warmup_state.warmed, e)
+    metrics.set('cache_warmup_users', warmup_state.warmed)
+    metrics.set('cache_warmup_ms', round(warmup_state.elapsed_ms, 1))
+    health_monitor.run_probe('cache_warmup')
+
+def _probe():
+    details = {'state': warmup_state.state, 'warmed': warmup_state.warmed}
+    if warmup_state.error:
+        details['error'] = warmup_state.error
+    return warmup_state.state in ('done', 'failed'), details
+
+def start_cache_warmup(fetch_page: FetchPage) -> None:
+    """Warm the profile cache in the background when CACHE_WARMUP_ENABLED is set"""
+    if not CACHE_WARMUP_ENABLED:
+        return
+    health_monitor.add_probe('cache_warmup', _probe)
+    threading.Thread(target=_run, args=(fetch_page,), name='cache-warmup', daemon=True).start()
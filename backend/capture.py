@@ -0,0 +1,136 @@
+"""
+Space Explorer traffic capture
+Records anonymized metadata and timing of every request to a compact log that
+replay_traffic.py can re-drive against any app variant. Nothing is registered
+on the app unless TRAFFIC_CAPTURE_PATH is set, so the disabled mode costs
+nothing per request.
+
+Each line holds tab-separated fields (see FIELDS): wall-clock milliseconds,
+method, route rule, actor, status, server time in ms, flags, request and
+response body bytes, and the query parameter names. The actor is a keyed hash
+of the user's email; no emails, tokens, bodies or query values are written.
+"""
+
+import atexit
+import base64
+import hashlib
+import json
+import os
+import random
+import secrets
+import threading
+import time
+from typing import Optional
+
+from flask import Flask, g, request
+
+from metrics import metrics
+
+TRAFFIC_CAPTURE_PATH = os.getenv('TRAFFIC_CAPTURE_PATH', '')
+# Share one salt between workers so the same user maps to the same actor in every process
+TRAFFIC_CAPTURE_SALT = os.getenv('TRAFFIC_CAPTURE_SALT', '') or secrets.token_hex(16)
+TRAFFIC_CAPTURE_SAMPLE = float(os.getenv('TRAFFIC_CAPTURE_SAMPLE', '1'))
+TRAFFIC_CAPTURE_FLUSH_S = float(os.getenv('TRAFFIC_CAPTURE_FLUSH_S', '1'))
+
+HEADER = '# space-explorer-capture v1\n'
+FIELDS = ('ts_ms', 'method', 'rule', 'actor', 'status', 'server_ms', 'flags', 'req_bytes', 'resp_bytes', 'query')
+# Request features that change the server's work, one letter each in the flags field
+FLAGS = (('If-None-Match', 'n'), ('If-Match', 'm'), ('Idempotency-Key', 'i'))
+FLUSH_RECORDS = 256
+
+def actor_id(email: Optional[str], salt: str = TRAFFIC_CAPTURE_SALT) -> str:
+    """Stable pseudonym for a user; '-' when the request carries no identity"""
+    if not email:
+        return '-'
+    return hashlib.blake2b(email.strip().lower().encode('utf-8'), key=salt.encode('utf-8')[:64], digest_size=5).hexdigest()
+
+def _token_email() -> Optional[str]:
+    """Email claim of the bearer token, read without verification (it only names the actor)"""
+    header = request.headers.get('Authorization', '')
+    parts = header.split(' ', 1)[-1].split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4)))
+    except ValueError:
+        return None
+    return claims.get('email') if isinstance(claims, dict) else None
+
+def _body_email() -> Optional[str]:
+    body = request.get_json(silent=True)
+    email = body.get('email') if isinstance(body, dict) else None
+    return email if isinstance(email, str) else None
+
+class CaptureLog:
+    """Buffered appender; each flush is a single O_APPEND write, so workers can share a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        if os.fstat(fd).st_size == 0:
+            os.write(fd, HEADER.encode('ascii'))
+        self._fd = fd
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            self._buffer.append(line)
+            due = len(self._buffer) >= FLUSH_RECORDS or time.monotonic() - self._flushed_at >= TRAFFIC_CAPTURE_FLUSH_S
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            lines, self._buffer = self._buffer, []
+            self._flushed_at = time.monotonic()
+        if lines:
+            os.write(self._fd, ''.join(lines).encode('utf-8'))
+            metrics.inc('traffic_captured', len(lines))
+
+_log: Optional[CaptureLog] = None
+
+def _start_capture():
+    if TRAFFIC_CAPTURE_SAMPLE >= 1 or random.random() < TRAFFIC_CAPTURE_SAMPLE:
+        g.capture_ts = time.time()
+        g.capture_started = time.perf_counter()
+
+def _record(response):
+    if 'capture_started' not in g:
+        return response
+    server_ms = (time.perf_counter() - g.capture_started) * 1000
+    rule = request.url_rule.rule if request.url_rule else '-'
+    email = _token_email() if 'Authorization' in request.headers else _body_email() if request.is_json else None
+    flags = ''.join(flag for header, flag in FLAGS if header in request.headers) or '-'
+    query = ','.join(sorted(request.args)) or '-'
+    resp_bytes = response.content_length if response.content_length is not None else 0
+    _log.append(f'{int(g.capture_ts * 1000)}\t{request.method}\t{rule}\t{actor_id(email)}\t{response.status_code}\t'
+                f'{server_ms:.2f}\t{flags}\t{request.content_length or 0}\t{resp_bytes}\t{query}\n')
+    return response
+
+def parse_line(line: str) -> Optional[dict]:
+    """One captured request as a dict keyed by FIELDS; None for the header and blank lines"""
+    if not line.strip() or line.startswith('#'):
+        return None
+    values = line.rstrip('\n').split('\t')
+    record = dict(zip(FIELDS, values))
+    record['ts_ms'] = int(record['ts_ms'])
+    record['status'] = int(record['status'])
+    record['server_ms'] = float(record['server_ms'])
+    record['req_bytes'] = int(record['req_bytes'])
+    record['resp_bytes'] = int(record['resp_bytes'])
+    record['flags'] = '' if record['flags'] == '-' else record['flags']
+    record['query'] = [] if record['query'] == '-' else record['query'].split(',')
+    return record
+
+def init_capture(app: Flask) -> None:
+    """Register the capture hooks when TRAFFIC_CAPTURE_PATH is set; call before init_compression to time it too"""
+    global _log
+    if not TRAFFIC_CAPTURE_PATH:
+        return
+    if _log is None:
+        _log = CaptureLog(TRAFFIC_CAPTURE_PATH)
+        atexit.register(_log.flush)
+    app.before_request(_start_capture)
+    app.after_request(_record)
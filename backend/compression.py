@@ -0,0 +1,183 @@
+"""
+Space Explorer response compression
+Negotiates gzip, brotli or zstd for large JSON and streamed responses
+"""
+
+import os
+import time
+import zlib
+
+from typing import Optional
+
+from flask import Flask, Response, request
+from werkzeug.datastructures import ETags
+
+from metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # optional codec
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional codec
+    zstandard = None
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+# Event streams are mostly idle; a compressor per open stream would cost far more memory than it saves
+UNCOMPRESSED_TYPES = ('text/event-stream',)
+
+class _Gzip:
+    """gzip framing over zlib; each flush emits a complete deflate block"""
+
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(max(1, min(level, 9)), zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _Brotli:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=max(0, min(level, 11)))
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=max(1, min(level, 22))).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+# Server preference order when the client ranks encodings equally
+CODECS = {'gzip': _Gzip}
+if zstandard is not None:
+    CODECS = {'zstd': _Zstd, **CODECS}
+if brotli is not None:
+    CODECS = {'br': _Brotli, **CODECS}
+
+# Suffixes that keep a strong ETag distinct per content coding, for every codec the server may know
+ETAG_SUFFIXES = ('-br', '-zstd', '-gzip')
+
+def identity_etag(etag: str) -> str:
+    """ETag of the uncompressed representation a possibly encoded ETag belongs to"""
+    for suffix in ETAG_SUFFIXES:
+        if etag.endswith(suffix):
+            return etag[:-len(suffix)]
+    return etag
+
+def matching_etag(condition: ETags, etag: str) -> Optional[str]:
+    """Tag in If-None-Match that names etag in any encoding, for the 304 to echo; None if none does"""
+    if condition.star_tag:
+        return etag
+    for tag in condition.as_set(include_weak=True):
+        if identity_etag(tag) == etag:
+            return tag
+    return None
+
+def negotiate(accept_encodings) -> str:
+    """Pick the encoding with the best client quality, ties broken by server preference"""
+    best, best_quality = None, 0
+    for encoding in CODECS:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _compressible(response: Response) -> bool:
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if 'Content-Encoding' in response.headers or response.direct_passthrough:
+        return False
+    mimetype = response.mimetype or ''
+    return mimetype.startswith(COMPRESSIBLE_TYPES) and mimetype not in UNCOMPRESSED_TYPES
+
+def _stream(chunks, codec, encoding: str):
+    """Compress a streamed body chunk by chunk, flushing after each one"""
+    cpu = 0.0
+    size_in = size_out = 0
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            started = time.thread_time()
+            data = codec.compress(chunk) + codec.flush()
+            cpu += time.thread_time() - started
+            size_in += len(chunk)
+            size_out += len(data)
+            if data:
+                yield data
+        started = time.thread_time()
+        tail = codec.finish()
+        cpu += time.thread_time() - started
+        size_out += len(tail)
+        yield tail
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+        _record(encoding, cpu, size_in, size_out, streamed=True)
+
+def _record(encoding: str, cpu: float, size_in: int, size_out: int, streamed: bool = False) -> None:
+    kind = 'stream' if streamed else 'body'
+    metrics.observe('compression_cpu_ms', cpu * 1000, encoding=encoding, kind=kind)
+    metrics.inc('compression_bytes_in', size_in, encoding=encoding)
+    metrics.inc('compression_bytes_out', size_out, encoding=encoding)
+
+def compress_response(response: Response) -> Response:
+    """after_request hook applying the negotiated encoding"""
+    if not _compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        codec = CODECS[encoding](COMPRESSION_LEVEL)
+        response.response = _stream(response.response, codec, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_SIZE:
+            metrics.inc('compression_skipped', reason='size')
+            return response
+        codec = CODECS[encoding](COMPRESSION_LEVEL)
+        started = time.thread_time()
+        compressed = codec.compress(body) + codec.finish()
+        _record(encoding, time.thread_time() - started, len(body), len(compressed))
+        response.set_data(compressed)
+
+    response.headers['Content-Encoding'] = encoding
+    # A strong validator must differ between byte-different representations
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f'{etag}-{encoding}')
+    return response
+
+def init_compression(app: Flask) -> None:
+    """Register response compression on a Flask app"""
+    if COMPRESSION_ENABLED:
+        app.after_request(compress_response)
@@ -4,6 +4,9 @@
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
+-- Enable trigram matching (indexes for the admin user search)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create users table
 CREATE TABLE IF NOT EXISTS users (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -23,15 +26,25 @@ CREATE TABLE IF NOT EXISTS users (
             "language": "en",
             "roles": ["user"]
         }
-    }'::jsonb
+    }'::jsonb,
+    version INTEGER NOT NULL DEFAULT 1
 );
 
+-- Existing databases: add the version column used for optimistic concurrency
+ALTER TABLE users ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
 -- Create indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_active ON users(is_active);
 CREATE INDEX IF NOT EXISTS idx_users_created_at ON users(created_at);
 CREATE INDEX IF NOT EXISTS idx_users_last_login ON users(last_login);
 
+-- User search: email prefixes (LIKE 'abc%') walk a pattern-ops btree in email order;
+-- trigram indexes serve name ILIKE prefixes and substring (LIKE '%abc%') matches
+CREATE INDEX IF NOT EXISTS idx_users_email_pattern ON users(email text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_users_email_trgm ON users USING gin (email gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_users_name_trgm ON users USING gin (name gin_trgm_ops);
+
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
@@ -48,6 +61,24 @@ CREATE TRIGGER update_users_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Bump the version whenever the user-editable fields change, so profile updates
+-- can be made conditional on the version the client last read (If-Match)
+CREATE OR REPLACE FUNCTION bump_users_version()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.name IS DISTINCT FROM OLD.name OR NEW.profile_data IS DISTINCT FROM OLD.profile_data THEN
+        NEW.version = OLD.version + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS bump_users_version ON users;
+CREATE TRIGGER bump_users_version
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION bump_users_version();
+
 -- Create user sessions table (optional - for session management)
 CREATE TABLE IF NOT EXISTS user_sessions (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -105,6 +136,16 @@ CREATE TRIGGER update_preferences_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Create user shard directory (optional - only read in sharded mode, on the SUPABASE_URL database)
+-- id is the users.id on its shard; there is no foreign key because users live in other databases
+CREATE TABLE IF NOT EXISTS user_shards (
+    id UUID PRIMARY KEY,
+    shard VARCHAR(64) NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_shards_shard ON user_shards(shard);
+
 -- Row Level Security (RLS) policies for Supabase
 -- Enable RLS on users table
 ALTER TABLE users ENABLE ROW LEVEL SECURITY;
@@ -135,7 +176,14 @@ ALTER TABLE user_preferences ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Users can manage own preferences" ON user_preferences
     FOR ALL USING (auth.uid() = user_id);
 
+-- Enable RLS on user_shards table
+-- No policies: only the service-role client reads and writes the directory, so the
+-- anon and authenticated roles can neither list nor repoint users' shards
+ALTER TABLE user_shards ENABLE ROW LEVEL SECURITY;
+REVOKE ALL ON user_shards FROM anon, authenticated;
+
 -- Create function to clean up expired sessions
+-- (one unbounded DELETE; on large tables use backend/purge_retention.py, which deletes in paced batches)
 CREATE OR REPLACE FUNCTION cleanup_expired_sessions()
 RETURNS void AS $$
 BEGIN
@@ -196,10 +244,12 @@ COMMENT ON COLUMN users.name IS 'User display name';
 COMMENT ON COLUMN users.password_hash IS 'Bcrypt hashed password';
 COMMENT ON COLUMN users.is_active IS 'Whether the user account is active';
 COMMENT ON COLUMN users.profile_data IS 'JSON object containing user profile and preferences';
+COMMENT ON COLUMN users.version IS 'Incremented when name or profile_data change; checked by conditional profile updates';
 
 COMMENT ON TABLE user_sessions IS 'User session management for refresh tokens';
 COMMENT ON TABLE user_audit_log IS 'Audit trail for user actions';
 COMMENT ON TABLE user_preferences IS 'Extended user preferences storage';
+COMMENT ON TABLE user_shards IS 'Shard holding each user in sharded mode';
 
 -- Create a function to validate email format
 CREATE OR REPLACE FUNCTION is_valid_email(email TEXT)
@@ -214,6 +264,7 @@ ALTER TABLE users ADD CONSTRAINT check_valid_email
 CHECK (is_valid_email(email));
 
 -- Create function to automatically clean up old audit logs
+-- (see purge_retention.py for a batched alternative on large tables)
 CREATE OR REPLACE FUNCTION cleanup_old_audit_logs()
 RETURNS void AS $$
 BEGIN
@@ -0,0 +1,59 @@
+"""
+Space Explorer read/write routing
+Reads go to read replicas and writes to the primary. A user who just wrote is
+pinned to the primary for a short window so they always read their own writes;
+the pin is kept in user_marks, so it holds in every worker of the host.
+"""
+
+import itertools
+import os
+import time
+from typing import Optional, Sequence
+
+from metrics import metrics
+from user_marks import UserMarks, user_marks
+
+# Comma-separated PostgREST base URLs of read replicas; empty sends every read to the primary
+SUPABASE_READ_URLS = [url.strip() for url in os.getenv('SUPABASE_READ_URLS', '').split(',') if url.strip()]
+# Should exceed the worst replication lag you are willing to hide from a user
+READ_YOUR_WRITES_WINDOW_S = float(os.getenv('READ_YOUR_WRITES_WINDOW_S', '5'))
+
+class RecentWrites:
+    """Per-user pins that expire after the read-your-writes window, seen by every worker on the host"""
+
+    def __init__(self, marks: UserMarks = user_marks, window_s: float = READ_YOUR_WRITES_WINDOW_S):
+        self.marks = marks
+        self.window_s = window_s
+
+    def mark(self, user_id) -> None:
+        # Wall-clock time, so the deadline means the same in every worker process
+        self.marks.set(user_id, 'pinned_until', time.time() + self.window_s)
+
+    def is_pinned(self, user_id) -> bool:
+        until = self.marks.get(user_id, 'pinned_until')
+        return until is not None and until > time.time()
+
+recent_writes = RecentWrites()
+
+class ReadRouter:
+    """Pick the client for a query: primary for writes, a replica for reads"""
+
+    def __init__(self, name: str, primary, replicas: Sequence = ()):
+        self.name = name
+        self.primary = primary
+        self.replicas = list(replicas)
+        self._cycle = itertools.cycle(self.replicas) if self.replicas else None
+
+    def read(self, user_id: Optional[str] = None):
+        """Client for a read, on behalf of user_id when the read is the user's own data"""
+        if self._cycle is None:
+            return self.primary
+        if user_id is not None and recent_writes.is_pinned(user_id):
+            metrics.inc('db_reads', client=self.name, target='primary', reason='recent_write')
+            return self.primary
+        metrics.inc('db_reads', client=self.name, target='replica')
+        return next(self._cycle)
+
+    def write(self):
+        return self.primary
+
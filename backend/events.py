@@ -0,0 +1,196 @@
+"""
+Space Explorer change events
+In-process publish/subscribe of per-user events, streamed to clients as
+server-sent events so they no longer poll /api/auth/me and /api/users/profile
+to notice changes.
+
+Every event is encoded once as an SSE frame, and the same bytes are queued
+for each of the user's connections. An idle connection holds only a slotted
+Subscription, a short deque and a wakeup event. Its stream sleeps until an
+event arrives, or writes a comment line every EVENTS_HEARTBEAT_S so that
+proxies keep the connection open and a dropped client is noticed. Serve the
+app with gthread or gevent workers, so an open stream does not pin a whole
+sync worker.
+
+Events reach only the streams of the process that published them, except
+account deactivations: those are also recorded in the host's user marks, and
+each worker with open streams polls the marks every EVENTS_WATCH_S and ends
+the deactivated users' streams it holds.
+"""
+
+import collections
+import itertools
+import os
+import threading
+import time
+from typing import Iterator, Optional
+
+from flask import Response
+
+from metrics import metrics
+from responses import dumps, static_error
+from user_marks import user_marks
+
+EVENTS_ENABLED = os.getenv('EVENTS_ENABLED', 'true').lower() == 'true'
+EVENTS_HEARTBEAT_S = float(os.getenv('EVENTS_HEARTBEAT_S', '25'))
+# Frames waiting per connection; a slower reader gets a resync event instead of the dropped ones
+EVENTS_QUEUE_SIZE = int(os.getenv('EVENTS_QUEUE_SIZE', '16'))
+EVENTS_MAX_CONNECTIONS = int(os.getenv('EVENTS_MAX_CONNECTIONS', '10000'))
+# Opening one more stream than this closes the user's oldest, e.g. a forgotten tab
+EVENTS_MAX_PER_USER = int(os.getenv('EVENTS_MAX_PER_USER', '5'))
+EVENTS_RETRY_MS = int(os.getenv('EVENTS_RETRY_MS', '5000'))
+# How often a worker looks for deactivations recorded by the host's other workers
+EVENTS_WATCH_S = float(os.getenv('EVENTS_WATCH_S', '1'))
+
+DEACTIVATED_MARK = 'deactivated'
+
+TOO_MANY_STREAMS = static_error(503, 'Too many open event streams, please try again later', 'TOO_MANY_STREAMS')
+
+HEARTBEAT = b': heartbeat\n\n'
+
+class Subscription:
+    """One open stream: frames not yet written and the frame that ends it"""
+
+    __slots__ = ('user_id', 'pending', 'wakeup', 'overflowed', 'final')
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.pending = collections.deque(maxlen=EVENTS_QUEUE_SIZE)
+        self.wakeup = threading.Event()
+        self.overflowed = False
+        # Kept out of pending so an overflow never drops it
+        self.final = None
+
+    def push(self, frame: bytes, final: bool = False) -> None:
+        if final:
+            if self.final is None:
+                self.final = frame
+        else:
+            if len(self.pending) == EVENTS_QUEUE_SIZE:
+                self.overflowed = True
+            self.pending.append(frame)
+        self.wakeup.set()
+
+class EventBus:
+    """Subscriptions by user id; publishing never blocks on a slow reader"""
+
+    def __init__(self, marks=None):
+        self._subscriptions = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._count = 0
+        # Host-shared marks watched for deactivations; the watcher starts with the first stream
+        self.marks = marks
+        self._watcher = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def frame(self, event: str, data) -> bytes:
+        """SSE frame with the next event id"""
+        return b'id: %d\nevent: %s\ndata: %s\n\n' % (next(self._ids), event.encode('ascii'), dumps(data))
+
+    def subscribe(self, user_id: str) -> Optional[Subscription]:
+        """New subscription, or None when EVENTS_MAX_CONNECTIONS are already open"""
+        with self._lock:
+            if self._count >= EVENTS_MAX_CONNECTIONS:
+                return None
+            subscriptions = self._subscriptions.setdefault(user_id, [])
+            if len(subscriptions) >= EVENTS_MAX_PER_USER:
+                oldest = subscriptions.pop(0)
+                oldest.push(self.frame('stream.replaced', {}), final=True)
+                self._count -= 1
+            subscription = Subscription(user_id)
+            subscriptions.append(subscription)
+            self._count += 1
+            if self._watcher is None and self.marks is not None and self.marks.shared:
+                self._watcher = threading.Thread(target=self._watch, name='event-watch', daemon=True)
+                self._watcher.start()
+        metrics.inc('event_streams_opened')
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions and subscription in subscriptions:
+                subscriptions.remove(subscription)
+                self._count -= 1
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def publish(self, user_id: str, event: str, data=None, final: bool = False) -> int:
+        """Queue an event for every stream of a user; final ends those streams after it"""
+        subscriptions = self._subscriptions.get(user_id)
+        if not subscriptions:
+            return 0
+        frame = self.frame(event, data if data is not None else {})
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            subscription.push(frame, final)
+        metrics.inc('events_published', event=event)
+        return len(subscriptions)
+
+    def deactivate(self, user_id: str) -> int:
+        """End a deactivated user's streams, on this worker now and on the host's others at their next poll"""
+        if self.marks is not None:
+            self.marks.set(user_id, DEACTIVATED_MARK)
+        return self.publish(user_id, 'account.deactivated', final=True)
+
+    def _watch(self) -> None:
+        checked = time.time()
+        while True:
+            time.sleep(EVENTS_WATCH_S)
+            now = time.time()
+            if self._count:
+                # Look back one more interval for marks committed late; a second final frame is ignored
+                for user_id, _ in self.marks.since(DEACTIVATED_MARK, checked - EVENTS_WATCH_S):
+                    if user_id in self._subscriptions:
+                        self.publish(user_id, 'account.deactivated', final=True)
+            checked = now
+
+    def drain(self, subscription: Subscription) -> bytes:
+        """Queued frames, or a resync event in place of them once some were dropped"""
+        if subscription.overflowed:
+            subscription.overflowed = False
+            subscription.pending.clear()
+            metrics.inc('event_stream_overflows')
+            return self.frame('resync', {})
+        frames = []
+        while subscription.pending:
+            frames.append(subscription.pending.popleft())
+        return b''.join(frames)
+
+    def stream(self, subscription: Subscription, ready: dict, expires_at: float) -> Iterator[bytes]:
+        """SSE body: a ready event, then queued frames and heartbeats until the token expires"""
+        try:
+            yield b'retry: %d\n' % EVENTS_RETRY_MS + self.frame('ready', ready)
+            while True:
+                # Read final before draining: every frame published ahead of it is then in pending
+                final = subscription.final
+                frames = self.drain(subscription)
+                if final is not None:
+                    yield frames + final
+                    return
+                if frames:
+                    yield frames
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield self.frame('token.expired', {})
+                    return
+                if not subscription.wakeup.wait(min(EVENTS_HEARTBEAT_S, remaining)):
+                    yield HEARTBEAT
+                    continue
+                subscription.wakeup.clear()
+        finally:
+            self.unsubscribe(subscription)
+
+def event_stream(body: Iterator[bytes]) -> Response:
+    """Streaming response that proxies and caches pass through unbuffered"""
+    response = Response(body, mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+events = EventBus(marks=user_marks)
+metrics.register('event_streams', lambda: len(events))
@@ -0,0 +1,159 @@
+"""
+Space Explorer health checks
+Liveness answers from the process alone; readiness serves the cached results of
+dependency probes that run on a background interval, so checks cost nothing per call.
+"""
+
+import datetime
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from metrics import metrics
+from passwords import rehash_queue_depth
+from responses import json_response
+
+logger = logging.getLogger(__name__)
+
+HEALTH_PROBE_INTERVAL = float(os.getenv('HEALTH_PROBE_INTERVAL', '10'))
+# Results older than this no longer count, e.g. when the probe thread is stuck on a hung call
+HEALTH_STALE_AFTER = float(os.getenv('HEALTH_STALE_AFTER', str(HEALTH_PROBE_INTERVAL * 3)))
+HEALTH_MAX_DB_LATENCY_MS = float(os.getenv('HEALTH_MAX_DB_LATENCY_MS', '1000'))
+HEALTH_MAX_POOL_SATURATION = float(os.getenv('HEALTH_MAX_POOL_SATURATION', '0.9'))
+HEALTH_MAX_REHASH_QUEUE = int(os.getenv('HEALTH_MAX_REHASH_QUEUE', '100'))
+
+# A probe returns (ok, details) and may raise; raising counts as not ok
+Probe = Callable[[], Tuple[bool, dict]]
+
+class ProbeResult:
+    __slots__ = ('ok', 'details', 'checked_at')
+
+    def __init__(self, ok: bool, details: dict, checked_at: float):
+        self.ok = ok
+        self.details = details
+        self.checked_at = checked_at
+
+class HealthMonitor:
+    """Runs registered probes on an interval and keeps their latest results"""
+
+    def __init__(self, interval_s: float = HEALTH_PROBE_INTERVAL, stale_after_s: float = HEALTH_STALE_AFTER):
+        self.interval_s = interval_s
+        self.stale_after_s = stale_after_s
+        self._probes: Dict[str, Probe] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def add_probe(self, name: str, probe: Probe) -> None:
+        self._probes[name] = probe
+
+    def run_probe(self, name: str) -> None:
+        """Run one probe now, e.g. when its dependency changes state between intervals"""
+        try:
+            ok, details = self._probes[name]()
+        except Exception as e:
+            ok, details = False, {'error': str(e)}
+        if not ok and (name not in self._results or self._results[name].ok):
+            logger.warning('Health probe %s failing: %s', name, details)
+        self._results[name] = ProbeResult(ok, details, time.time())
+
+    def run_once(self) -> None:
+        for name in list(self._probes):
+            self.run_probe(name)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='health-probes', daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            self.run_once()
+            time.sleep(self.interval_s)
+
+    def readiness(self) -> Tuple[bool, dict]:
+        now = time.time()
+        ready = bool(self._probes)
+        probes = {}
+        for name in self._probes:
+            result = self._results.get(name)
+            if result is None:
+                status = 'pending'
+            elif now - result.checked_at > self.stale_after_s:
+                status = 'stale'
+            else:
+                status = 'ok' if result.ok else 'failing'
+            ready = ready and status == 'ok'
+            probes[name] = {
+                'status': status,
+                'age_s': round(now - result.checked_at, 1) if result else None,
+                **(result.details if result else {})
+            }
+        return ready, probes
+
+health_monitor = HealthMonitor()
+
+def database_probe(query: Callable[[], object], max_latency_ms: float = HEALTH_MAX_DB_LATENCY_MS,
+                   **labels) -> Probe:
+    """Time a cheap query; slow counts as failing"""
+    def probe():
+        started = time.perf_counter()
+        query()
+        latency_ms = (time.perf_counter() - started) * 1000
+        metrics.set('health_db_latency_ms', round(latency_ms, 2), **labels)
+        return latency_ms <= max_latency_ms, {'latency_ms': round(latency_ms, 2)}
+    return probe
+
+def httpx_pool_stats(*sessions) -> dict:
+    """Active and maximum connections across httpx clients' connection pools"""
+    in_use = size = 0
+    for session in sessions:
+        pool = getattr(getattr(session, '_transport', None), '_pool', None)
+        if pool is None:
+            continue
+        in_use += sum(1 for connection in pool.connections if not connection.is_idle())
+        size += pool._max_connections or 0
+    return {'in_use': in_use, 'max': size}
+
+def pool_probe(stats: Callable[[], dict], max_saturation: float = HEALTH_MAX_POOL_SATURATION) -> Probe:
+    """Share of pooled connections in use"""
+    def probe():
+        current = stats()
+        saturation = current['in_use'] / current['max'] if current['max'] else 0.0
+        metrics.set('health_pool_saturation', round(saturation, 3))
+        return saturation <= max_saturation, {**current, 'saturation': round(saturation, 3)}
+    return probe
+
+def rehash_queue_probe(max_depth: int = HEALTH_MAX_REHASH_QUEUE) -> Probe:
+    """Pending background bcrypt rehashes"""
+    def probe():
+        depth = rehash_queue_depth()
+        return depth <= max_depth, {'depth': depth}
+    return probe
+
+def init_health(**probes: Probe) -> None:
+    """Register the app's probes and start the background prober"""
+    for name, probe in probes.items():
+        health_monitor.add_probe(name, probe)
+    health_monitor.add_probe('bcrypt_queue', rehash_queue_probe())
+    health_monitor.start()
+
+def health_response(mode: Optional[str] = None):
+    """Liveness by default; ?mode=ready reports the cached probe results"""
+    if mode != 'ready':
+        return json_response({
+            'success': True,
+            'message': 'Space Explorer API is running',
+            'timestamp': datetime.datetime.utcnow().isoformat(),
+            'environment': os.getenv('NODE_ENV', 'development')
+        })
+    ready, probes = health_monitor.readiness()
+    return json_response({
+        'success': ready,
+        'message': 'ready' if ready else 'not ready',
+        'data': {'probes': probes}
+    }, 200 if ready else 503)
+
+metrics.register('health_ready', lambda: int(health_monitor.readiness()[0]))
@@ -0,0 +1,145 @@
+"""
+Space Explorer idempotency keys
+Replays the first response of a request carrying an Idempotency-Key header to
+retries of it, and makes concurrent duplicates wait for the request in flight
+instead of redoing its work. Keys live in a bounded per-worker store.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, make_response, request
+
+from metrics import metrics
+from responses import static_error
+from throttle import client_ip
+
+IDEMPOTENCY_TTL_S = float(os.getenv('IDEMPOTENCY_TTL_S', '86400'))
+IDEMPOTENCY_MAX_KEYS = int(os.getenv('IDEMPOTENCY_MAX_KEYS', '10000'))
+# How long a duplicate waits for the original request before giving up with 409
+IDEMPOTENCY_WAIT_S = float(os.getenv('IDEMPOTENCY_WAIT_S', '30'))
+
+MAX_KEY_LENGTH = 255
+# Response headers worth replaying; the rest are recomputed per response
+REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Cache-Control', 'Location')
+
+INVALID_IDEMPOTENCY_KEY = static_error(400, f'Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters', 'INVALID_IDEMPOTENCY_KEY')
+IDEMPOTENCY_KEY_REUSED = static_error(422, 'Idempotency-Key was already used with a different request', 'IDEMPOTENCY_KEY_REUSED')
+IDEMPOTENCY_IN_PROGRESS = static_error(409, 'A request with this Idempotency-Key is still in progress', 'IDEMPOTENCY_IN_PROGRESS')
+
+class StoredResponse:
+    """One key's request fingerprint and, once the original finishes, its response"""
+    __slots__ = ('fingerprint', 'done', 'status', 'body', 'headers', 'expires_at')
+
+    def __init__(self, fingerprint: str, expires_at: float):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.status = None
+        self.body = None
+        self.headers = None
+        self.expires_at = expires_at
+
+    def replay(self):
+        response = make_response(self.body, self.status)
+        response.headers.update(self.headers)
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response
+
+class IdempotencyStore:
+    """Bounded LRU of StoredResponse entries with a TTL"""
+
+    def __init__(self, ttl_s: float = IDEMPOTENCY_TTL_S, max_keys: int = IDEMPOTENCY_MAX_KEYS):
+        self.ttl_s = ttl_s
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def claim(self, key: str, fingerprint: str) -> tuple:
+        """(entry, owner): a new pending entry we own, or the existing live one"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at >= now:
+                self._entries.move_to_end(key)
+                return entry, False
+            entry = self._entries[key] = StoredResponse(fingerprint, now + self.ttl_s)
+            while len(self._entries) > self.max_keys:
+                # Evicting a pending entry is harmless: its owner and waiters hold it directly
+                self._entries.popitem(last=False)
+            return entry, True
+
+    def release(self, key: str, entry: StoredResponse) -> None:
+        """Forget a key whose original failed, so the next attempt runs for real"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+        entry.done.set()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+idempotency_store = IdempotencyStore()
+
+def _fingerprint() -> str:
+    return hashlib.sha256(request.get_data(cache=True)).hexdigest()
+
+def _client() -> str:
+    """Who sent the request: the token's subject, or the client address on unauthenticated routes"""
+    claims = g.get('token_claims')
+    if claims and claims.get('userId'):
+        return f"user:{claims['userId']}"
+    return f'ip:{client_ip()}'
+
+def idempotent(f):
+    """Honour an Idempotency-Key header; keys are scoped to the client, the route and positional args (the user)"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        header = request.headers.get('Idempotency-Key')
+        if header is None:
+            return f(*args, **kwargs)
+        if not 0 < len(header) <= MAX_KEY_LENGTH:
+            return INVALID_IDEMPOTENCY_KEY()
+
+        # Two clients that happen to pick the same key must never see each other's responses
+        key = '|'.join((_client(), request.method, request.path, *map(str, args), header))
+        fingerprint = _fingerprint()
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_S
+        while True:
+            entry, owner = idempotency_store.claim(key, fingerprint)
+            if owner:
+                break
+            if entry.fingerprint != fingerprint:
+                metrics.inc('idempotency_requests', result='key_reused')
+                return IDEMPOTENCY_KEY_REUSED()
+            if not entry.done.is_set():
+                metrics.inc('idempotency_requests', result='waited')
+                if not entry.done.wait(max(0.0, deadline - time.monotonic())):
+                    return IDEMPOTENCY_IN_PROGRESS()
+            if entry.status is not None:
+                metrics.inc('idempotency_requests', result='replayed')
+                return entry.replay()
+            # The original failed and released the key; try to run it ourselves
+
+        try:
+            response = make_response(f(*args, **kwargs))
+        except Exception:
+            idempotency_store.release(key, entry)
+            raise
+        if response.status_code >= 500 or response.is_streamed:
+            # Server errors are retryable, so they are not pinned to the key
+            idempotency_store.release(key, entry)
+            return response
+        entry.body = response.get_data()
+        entry.headers = {name: response.headers[name] for name in REPLAYED_HEADERS if name in response.headers}
+        entry.status = response.status_code
+        entry.done.set()
+        metrics.inc('idempotency_requests', result='stored')
+        return response
+
+    return decorated
+
+metrics.register('idempotency_keys', lambda: len(idempotency_store))
@@ -0,0 +1,79 @@
+"""
+Space Explorer lazy loading helpers
+Defer heavy imports and client construction until first use so workers start fast
+"""
+
+import importlib
+import os
+import threading
+from typing import Callable, List
+
+class LazyObject:
+    """Proxy that builds its target with factory() on first attribute access"""
+
+    def __init__(self, factory: Callable[[], object]):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    @property
+    def built(self) -> bool:
+        return self._target is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self._resolve(), name)
+
+def lazy_import(name: str) -> LazyObject:
+    """Module proxy that imports on first attribute access"""
+    return LazyObject(lambda: importlib.import_module(name))
+
+def load_env_file(start: str) -> bool:
+    """Load the nearest .env at or above start; python-dotenv is imported only when one exists"""
+    directory = os.path.abspath(start)
+    while True:
+        path = os.path.join(directory, '.env')
+        if os.path.isfile(path):
+            from dotenv import load_dotenv
+            return load_dotenv(path)
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return False
+        directory = parent
+
+class DeferredStartup:
+    """Background work (probes, calibration, warm-up) started by the server, never by an import
+
+    Tasks run once, from start() in a server entry point or else before the
+    first request, so importing the app for tooling or tests does no I/O.
+    """
+
+    def __init__(self):
+        self._tasks: List[Callable[[], object]] = []
+        self._started = False
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    def add(self, task: Callable[[], object]) -> None:
+        self._tasks.append(task)
+
+    def start(self) -> None:
+        if self._started:
+            return
+        with self._lock:
+            if not self._started:
+                for task in self._tasks:
+                    task()
+                self._started = True
+
+    def init_app(self, app) -> None:
+        app.before_request(self.start)
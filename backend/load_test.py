@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Space Explorer offline load test
+Boots app.py or app_simple.py against a local PostgREST stand-in and drives a
+mix of logins, /me polls and profile edits, reporting per-route latency.
+
+Usage:
+    python load_test.py --app app --requests 2000 --concurrency 16 --latency lognormal:2:0.5 --seed 7
+"""
+
+import argparse
+import importlib
+import logging
+import os
+import random
+import secrets
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from werkzeug.serving import make_server
+
+from postgrest_standin import Faults, start_standin
+
+def percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def parse_mix(spec: str) -> dict:
+    mix = {}
+    for part in spec.split(','):
+        route, _, weight = part.partition('=')
+        mix[route.strip()] = float(weight)
+    return mix
+
+def boot_app(module_name: str, standin_url: str, bcrypt_rounds: int):
+    """Import an app module wired to the stand-in and serve it on a free port"""
+    os.environ['SUPABASE_URL'] = standin_url
+    os.environ['BCRYPT_ROUNDS'] = str(bcrypt_rounds)
+    # Every simulated user shares one address, which the login throttle would cap
+    os.environ.setdefault('THROTTLE_ENABLED', 'false')
+    # /metrics answers only with the admin token
+    os.environ.setdefault('ADMIN_TOKEN', secrets.token_hex(16))
+    module = importlib.import_module(module_name)
+    # Per-request access and client logs would dominate the measurement
+    for name in ('werkzeug', 'httpx', 'access'):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, module.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}', server
+
+def seed_users(base_url: str, count: int) -> list:
+    """Register test users and return (email, password, token) tuples"""
+    users = []
+    for i in range(count):
+        email, password = f'loadtest{i}@spaceexplorer.com', 'LoadTest123!'
+        requests.post(f'{base_url}/api/auth/register', json={'name': f'Load Test {i}', 'email': email, 'password': password})
+        login = requests.post(f'{base_url}/api/auth/login', json={'email': email, 'password': password})
+        if login.status_code != 200:
+            raise RuntimeError(f'Seeding failed for {email}: {login.status_code} {login.text}')
+        users.append((email, password, login.json()['data']['tokens']['accessToken']))
+    return users
+
+def run(base_url: str, users: list, total: int, concurrency: int, mix: dict, seed: int) -> dict:
+    rng = random.Random(seed)
+    routes = list(mix)
+    plan = [(rng.choices(routes, weights=[mix[r] for r in routes])[0], rng.choice(users)) for _ in range(total)]
+    results = {route: {'latencies': [], 'errors': 0} for route in routes}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def call(item):
+        route, (email, password, token) = item
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        headers = {'Authorization': f'Bearer {token}'}
+        started = time.perf_counter()
+        try:
+            if route == 'login':
+                response = session.post(f'{base_url}/api/auth/login', json={'email': email, 'password': password})
+            elif route == 'me':
+                response = session.get(f'{base_url}/api/auth/me', headers=headers)
+            elif route == 'profile':
+                response = session.get(f'{base_url}/api/users/profile', headers=headers)
+            else:
+                response = session.put(f'{base_url}/api/users/profile', headers=headers,
+                                       json={'profile_data': {'bio': f'edited {time.time()}'}})
+            ok = response.status_code < 400
+        except requests.RequestException:
+            ok = False
+        elapsed = (time.perf_counter() - started) * 1000
+        with lock:
+            results[route]['latencies'].append(elapsed)
+            if not ok:
+                results[route]['errors'] += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, plan))
+    results['_wall_s'] = time.perf_counter() - started
+    return results
+
+def report(results: dict) -> None:
+    wall = results.pop('_wall_s')
+    total = sum(len(r['latencies']) for r in results.values())
+    print(f"{'route':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for route, data in results.items():
+        lat = data['latencies']
+        print(f'{route:<10}{len(lat):>8}{data["errors"]:>8}{percentile(lat, 50):>10.1f}'
+              f'{percentile(lat, 95):>10.1f}{percentile(lat, 99):>10.1f}{max(lat or [0]):>10.1f}')
+    print(f'{total} requests in {wall:.1f}s ({total / wall:.0f} req/s)')
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline end-to-end load test against the PostgREST stand-in')
+    parser.add_argument('--app', default='app', choices=('app', 'app_simple'))
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--mix', default=None,
+                        help='route weights, default login=1,me=8,profile=3,update=1 (login=1,me=8 for app_simple)')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--latency', default='none', help='stand-in latency distribution, see postgrest_standin.py')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-s', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--replicas', type=int, default=0,
+                        help='read-only stand-ins sharing the primary store, used via SUPABASE_READ_URLS (app.py)')
+    args = parser.parse_args()
+    if args.mix is None:
+        args.mix = 'login=1,me=8' if args.app == 'app_simple' else 'login=1,me=8,profile=3,update=1'
+
+    standin = start_standin()
+    replicas = [start_standin(store=standin.store, read_only=True) for _ in range(args.replicas)]
+    os.environ['SUPABASE_READ_URLS'] = ','.join(replica.url for replica in replicas)
+    base_url, _ = boot_app(args.app, standin.url, args.bcrypt_rounds)
+    print(f'🚀 Load testing {args.app}.py at {base_url} (stand-in {standin.url})')
+
+    users = seed_users(base_url, args.users)
+    # Faults apply to the measured run only, so seeding always succeeds
+    standin.faults = Faults(args.latency, args.error_rate, 503, args.timeout_rate, args.timeout_s, args.seed)
+    print(f'📊 {args.requests} requests, concurrency {args.concurrency}, mix {args.mix}, faults {args.latency}')
+    print('=' * 66)
+    report(run(base_url, users, args.requests, args.concurrency, parse_mix(args.mix), args.seed))
+    if replicas:
+        counters = requests.get(f'{base_url}/metrics', headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']}).json()['counters']
+        print('read routing:', {key: value for key, value in counters.items() if key.startswith('db_reads')})
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Space Explorer logging pipeline
+Request threads only enqueue records; a listener thread formats structured JSON
+and writes it, so a slow sink never adds latency to a request.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from typing import Optional
+
+from flask import Flask, g, has_request_context, request
+
+from metrics import metrics
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Access log sampling per route rule, e.g. "/api/auth/me=0.05,/health=0"; 5xx are kept unless the rate is 0
+LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '/health=0,/metrics=0')
+LOG_ACCESS_DEFAULT_RATE = float(os.getenv('LOG_ACCESS_DEFAULT_RATE', '1'))
+
+# LogRecord attributes that are not user-supplied `extra` fields
+_RESERVED = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id', 'route'}
+
+def parse_sample_rates(spec: str) -> dict:
+    rates = {}
+    for part in filter(None, (p.strip() for p in spec.split(','))):
+        route, _, rate = part.rpartition('=')
+        rates[route] = float(rate)
+    return rates
+
+_sample_rates = parse_sample_rates(LOG_SAMPLE_RATES)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with request context and any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+            entry['route'] = record.route
+        for key, value in vars(record).items():
+            if key not in _RESERVED:
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them; drop and count when the queue is full"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only capture the request context here; message formatting happens on the listener
+        if has_request_context():
+            record.request_id = g.get('request_id')
+            record.route = request.url_rule.rule if request.url_rule else request.path
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            metrics.inc('log_records_dropped')
+
+class _Pipeline:
+    log_queue: Optional[queue.Queue] = None
+    listener: Optional[logging.handlers.QueueListener] = None
+
+_pipeline = _Pipeline()
+
+def _assign_request_id():
+    incoming = request.headers.get('X-Request-ID', '')
+    g.request_id = incoming if 0 < len(incoming) <= 64 and incoming.isprintable() else uuid.uuid4().hex
+    g.request_started = time.perf_counter()
+
+def _access_log(response):
+    if 'request_id' not in g:
+        return response
+    response.headers['X-Request-ID'] = g.request_id
+    route = request.url_rule.rule if request.url_rule else request.path
+    rate = _sample_rates.get(route, LOG_ACCESS_DEFAULT_RATE)
+    if rate <= 0 or (response.status_code < 500 and rate < 1 and random.random() >= rate):
+        return response
+    logging.getLogger('access').info(
+        '%s %s %s', request.method, route, response.status_code,
+        extra={'status': response.status_code,
+               'duration_ms': round((time.perf_counter() - g.request_started) * 1000, 2),
+               'sample_rate': rate})
+    return response
+
+def init_logging(app: Optional[Flask] = None) -> None:
+    """Route the root logger through the queue and, given an app, add request ids and access logs"""
+    if _pipeline.listener is None:
+        sink = logging.StreamHandler(sys.stdout)
+        sink.setFormatter(JsonFormatter() if LOG_FORMAT == 'json'
+                          else logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        _pipeline.log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _pipeline.listener = logging.handlers.QueueListener(_pipeline.log_queue, sink)
+        _pipeline.listener.start()
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(BoundedQueueHandler(_pipeline.log_queue))
+        root.setLevel(LOG_LEVEL)
+        metrics.register('log_queue_depth', _pipeline.log_queue.qsize)
+        atexit.register(shutdown_logging)
+
+    if app is not None:
+        app.before_request(_assign_request_id)
+        app.after_request(_access_log)
+
+def shutdown_logging() -> None:
+    """Flush queued records; called at exit"""
+    if _pipeline.listener is not None:
+        _pipeline.listener.stop()
+        _pipeline.listener = None
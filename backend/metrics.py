@@ -0,0 +1,98 @@
+"""
+Space Explorer metrics registry
+Thread-safe in-process counters, gauges and timing summaries
+"""
+
+import threading
+from typing import Callable, Dict
+
+def _key(name: str, labels: dict) -> str:
+    """Render a metric name with its labels, e.g. name{encoding=gzip}"""
+    if not labels:
+        return name
+    rendered = ','.join(f'{label}={labels[label]}' for label in sorted(labels))
+    return f'{name}{{{rendered}}}'
+
+class Summary:
+    """Count, total and max of observed values"""
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'avg': round(self.total / self.count, 6) if self.count else 0.0,
+            'max': round(self.max, 6)
+        }
+
+class Metrics:
+    """Registry of named metrics shared by the app modules"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._summaries: Dict[str, Summary] = {}
+        self._collectors: Dict[str, Callable[[], object]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increment a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge to its current value"""
+        key = _key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation in a summary"""
+        key = _key(name, labels)
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = Summary()
+            summary.observe(value)
+
+    def register(self, name: str, collect: Callable[[], object]) -> None:
+        """Register a callable evaluated on every snapshot"""
+        self._collectors[name] = collect
+
+    def counter(self, name: str, **labels) -> float:
+        return self._counters.get(_key(name, labels), 0)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as plain JSON-serializable data"""
+        with self._lock:
+            data = {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'summaries': {key: summary.as_dict() for key, summary in self._summaries.items()}
+            }
+        for name, collect in list(self._collectors.items()):
+            try:
+                data['gauges'][name] = collect()
+            except Exception as e:
+                data['gauges'][name] = f'error: {e}'
+        return data
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+metrics = Metrics()
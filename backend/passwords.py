@@ -0,0 +1,140 @@
+"""
+Space Explorer password hashing
+bcrypt with a cost factor calibrated at startup and transparent rehash on login
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from lazy import lazy_import
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# The bcrypt extension loads with the first hash, not with the app
+bcrypt = lazy_import('bcrypt')
+
+BCRYPT_TARGET_MS = float(os.getenv('BCRYPT_TARGET_MS', '250'))
+# Never calibrate below the cost hashes were stored at before calibration existed
+BCRYPT_MIN_ROUNDS = int(os.getenv('BCRYPT_MIN_ROUNDS', '12'))
+BCRYPT_MAX_ROUNDS = int(os.getenv('BCRYPT_MAX_ROUNDS', '16'))
+# bcrypt only looks at the first 72 bytes; newer bcrypt modules refuse longer input
+BCRYPT_MAX_BYTES = 72
+
+class _Cost:
+    """Calibrated cost factor and its measured hash latency"""
+    rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    hash_ms: Optional[float] = None
+    calibrated = False
+    # Cleared while a background calibration runs; new hashes wait for it
+    ready = threading.Event()
+
+_cost = _Cost()
+_cost.ready.set()
+_rehash_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bcrypt-rehash')
+_pending = set()
+_pending_lock = threading.Lock()
+
+def _time_hash(rounds: int, samples: int = 3) -> float:
+    """Best-of-N wall time in milliseconds for one hash at the given cost"""
+    salt = bcrypt.gensalt(rounds=rounds)
+    best = float('inf')
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b'calibration-password', salt)
+        best = min(best, (time.perf_counter() - started) * 1000)
+    return best
+
+def calibrate(target_ms: float = BCRYPT_TARGET_MS,
+              min_rounds: int = BCRYPT_MIN_ROUNDS,
+              max_rounds: int = BCRYPT_MAX_ROUNDS) -> int:
+    """Pick the highest cost whose hash latency stays within the target"""
+    base_ms = _time_hash(min_rounds)
+    rounds, estimate = min_rounds, base_ms
+    # Each extra round doubles the work, so extrapolate instead of timing slow costs
+    while rounds < max_rounds and estimate * 2 <= target_ms:
+        rounds += 1
+        estimate *= 2
+    if rounds != min_rounds:
+        estimate = _time_hash(rounds, samples=1)
+    _cost.rounds, _cost.hash_ms, _cost.calibrated = rounds, estimate, True
+    logger.info('bcrypt cost calibrated to %d rounds (%.1f ms, target %.0f ms)', rounds, estimate, target_ms)
+    return rounds
+
+def _calibrate_in_background() -> None:
+    try:
+        calibrate()
+    except Exception as e:
+        logger.warning('bcrypt calibration failed, keeping %d rounds: %s', _cost.rounds, e)
+    finally:
+        _cost.ready.set()
+
+def init_passwords() -> None:
+    """Calibrate off the startup path unless BCRYPT_ROUNDS pins the cost"""
+    if os.getenv('BCRYPT_ROUNDS') or not _cost.ready.is_set():
+        return
+    _cost.ready.clear()
+    threading.Thread(target=_calibrate_in_background, name='bcrypt-calibration', daemon=True).start()
+
+def current_rounds() -> int:
+    return _cost.rounds
+
+def _secret(password: str) -> bytes:
+    """Password bytes as bcrypt uses them, truncated like older bcrypt modules did silently"""
+    return password.encode('utf-8')[:BCRYPT_MAX_BYTES]
+
+def hash_password(password: str) -> str:
+    """Hash password using bcrypt at the calibrated cost"""
+    _cost.ready.wait()
+    salt = bcrypt.gensalt(rounds=_cost.rounds)
+    return bcrypt.hashpw(_secret(password), salt).decode('utf-8')
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Verify password against hash"""
+    return bcrypt.checkpw(_secret(password), hashed.encode('utf-8'))
+
+def hash_rounds(hashed: str) -> int:
+    """Cost factor stored in a modular-crypt bcrypt hash ($2b$12$...)"""
+    return int(hashed.split('$')[2])
+
+def needs_rehash(hashed: str) -> bool:
+    """Whether a stored hash's cost is below the calibrated one; costs are never lowered"""
+    if not _cost.ready.is_set():
+        return False
+    try:
+        return hash_rounds(hashed) < _cost.rounds
+    except (IndexError, ValueError):
+        return False
+
+def schedule_rehash(key, password: str, store: Callable[[str], None]) -> bool:
+    """Rehash a verified password in the background and persist it with store(new_hash)"""
+    with _pending_lock:
+        if key in _pending:
+            return False
+        _pending.add(key)
+
+    def run():
+        try:
+            store(hash_password(password))
+            metrics.inc('bcrypt_rehash_total', result='ok')
+        except Exception as e:
+            metrics.inc('bcrypt_rehash_total', result='error')
+            logger.warning('Password rehash failed: %s', e)
+        finally:
+            with _pending_lock:
+                _pending.discard(key)
+
+    _rehash_pool.submit(run)
+    return True
+
+def rehash_queue_depth() -> int:
+    return len(_pending)
+
+metrics.register('bcrypt_rounds', current_rounds)
+metrics.register('bcrypt_hash_ms', lambda: _cost.hash_ms and round(_cost.hash_ms, 1))
+metrics.register('bcrypt_target_ms', lambda: BCRYPT_TARGET_MS)
+metrics.register('bcrypt_rehash_pending', rehash_queue_depth)
@@ -0,0 +1,666 @@
+#!/usr/bin/env python3
+"""
+Space Explorer local PostgREST stand-in
+Serves the subset of /rest/v1 the apps use (select, filters, insert, upsert,
+update, delete) from SQLite, with injectable latency, errors and timeouts.
+
+Usage:
+    python postgrest_standin.py --port 54321 --latency lognormal:2.5:0.6 --error-rate 0.01 --seed 7
+    SUPABASE_URL=http://localhost:54321 python app.py
+"""
+
+import argparse
+import datetime
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_PROFILE_DATA = {
+    'avatar': None,
+    'bio': '',
+    'preferences': {'theme': 'space', 'notifications': True, 'language': 'en', 'roles': ['user']}
+}
+
+# Column types per table, mirroring database/schema.sql
+TABLES: Dict[str, Dict[str, str]] = {
+    'users': {
+        'id': 'uuid', 'email': 'text', 'name': 'text', 'password_hash': 'text',
+        'is_active': 'bool', 'created_at': 'timestamp', 'updated_at': 'timestamp',
+        'last_login': 'timestamp', 'profile_data': 'json', 'version': 'int'
+    },
+    'user_sessions': {
+        'id': 'uuid', 'user_id': 'uuid', 'refresh_token': 'text', 'expires_at': 'timestamp',
+        'created_at': 'timestamp', 'last_used': 'timestamp', 'user_agent': 'text', 'ip_address': 'text'
+    },
+    'user_audit_log': {
+        'id': 'uuid', 'user_id': 'uuid', 'action': 'text', 'resource': 'text', 'resource_id': 'uuid',
+        'details': 'json', 'ip_address': 'text', 'user_agent': 'text', 'created_at': 'timestamp'
+    },
+    'user_preferences': {
+        'id': 'uuid', 'user_id': 'uuid', 'preference_key': 'text', 'preference_value': 'json',
+        'created_at': 'timestamp', 'updated_at': 'timestamp'
+    },
+    'user_shards': {'id': 'uuid', 'shard': 'text', 'updated_at': 'timestamp'},
+}
+
+DEFAULTS = {
+    'users': {'is_active': True, 'profile_data': DEFAULT_PROFILE_DATA, 'version': 1},
+}
+
+UNIQUE = {
+    'users': [('email',)],
+    'user_sessions': [('refresh_token',)],
+    'user_preferences': [('user_id', 'preference_key')],
+}
+
+INDEXES = {
+    'users': [('last_login',), ('created_at',), ('is_active',)],
+    'user_sessions': [('user_id',), ('expires_at',)],
+    'user_audit_log': [('user_id',), ('created_at',)],
+    'user_preferences': [('user_id',)],
+    'user_shards': [('shard',)],
+}
+
+# Columns with in-memory prefix indexes: like/ilike 'abc*' filters on them become
+# range scans over an index on the column (like) or on lower(column) (ilike),
+# standing in for the text_pattern_ops and pg_trgm indexes of the real schema
+PREFIX_INDEXES = {
+    'users': ('name', 'email'),
+}
+
+# Tables whose updated_at is maintained by the update_*_updated_at triggers
+TOUCH_ON_UPDATE = {'users', 'user_preferences'}
+
+# Columns whose changes bump users.version (the bump_users_version trigger)
+VERSIONED_COLUMNS = ('name', 'profile_data')
+
+EMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+
+OPERATORS = {
+    'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<=',
+    'like': 'LIKE', 'ilike': 'LIKE'
+}
+
+RESERVED_PARAMS = {'select', 'order', 'limit', 'offset', 'on_conflict', 'columns'}
+
+class PostgrestError(Exception):
+    """Error rendered in PostgREST's JSON error shape"""
+
+    def __init__(self, status: int, code: str, message: str, details: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {'code': code, 'message': message, 'details': details, 'hint': None}
+
+def now_iso() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+class Faults:
+    """Latency, error and timeout injection settings"""
+
+    def __init__(self, latency: str = 'none', error_rate: float = 0.0, error_status: int = 503,
+                 timeout_rate: float = 0.0, timeout_s: float = 30.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.timeout_rate = timeout_rate
+        self.timeout_s = timeout_s
+        self.seed = seed
+        self._sampler = parse_latency(latency)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def next_rng(self) -> random.Random:
+        """Per-request RNG; with a seed the n-th request always draws the same values"""
+        with self._lock:
+            self._counter += 1
+            counter = self._counter
+        if self.seed is None:
+            return random.Random()
+        return random.Random(self.seed * 1_000_003 + counter)
+
+    def sample_latency(self, rng: random.Random) -> float:
+        return max(0.0, self._sampler(rng)) / 1000
+
+    def as_dict(self) -> dict:
+        return {
+            'latency': self.latency, 'error_rate': self.error_rate, 'error_status': self.error_status,
+            'timeout_rate': self.timeout_rate, 'timeout_s': self.timeout_s, 'seed': self.seed,
+            'requests': self._counter
+        }
+
+def parse_latency(spec: str):
+    """Build a sampler returning milliseconds from a spec like 'uniform:5:20'"""
+    name, *args = spec.split(':')
+    values = [float(a) for a in args]
+    if name in ('', 'none'):
+        return lambda rng: 0.0
+    if name == 'fixed':
+        return lambda rng: values[0]
+    if name == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1])
+    if name == 'normal':
+        return lambda rng: rng.gauss(values[0], values[1])
+    if name == 'exponential':
+        return lambda rng: rng.expovariate(1 / values[0])
+    if name == 'lognormal':
+        # mu and sigma of the underlying normal, in log-milliseconds
+        return lambda rng: rng.lognormvariate(values[0], values[1])
+    if name == 'pareto':
+        # scale in ms and shape alpha; heavy tail for reproducing p99 spikes
+        return lambda rng: values[0] * rng.paretovariate(values[1])
+    raise ValueError(f'Unknown latency distribution: {spec}')
+
+class Store:
+    """SQLite-backed tables with PostgREST-style query semantics"""
+
+    def __init__(self, path: str = ':memory:', prefix_indexes: bool = True):
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.lock = threading.Lock()
+        self.prefix_indexes = prefix_indexes
+        self._create()
+
+    def _create(self) -> None:
+        for table, cols in TABLES.items():
+            defs = [f'"{col}" {"INTEGER" if kind in ("bool", "int") else "TEXT"}' for col, kind in cols.items()]
+            defs[0] += ' PRIMARY KEY'
+            for unique in UNIQUE.get(table, []):
+                defs.append(f'UNIQUE ({", ".join(unique)})')
+            self.conn.execute(f'CREATE TABLE IF NOT EXISTS {table} ({", ".join(defs)})')
+            for index in INDEXES.get(table, []):
+                name = f'idx_{table}_{"_".join(index)}'
+                self.conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(index)})')
+            if self.prefix_indexes:
+                for col in PREFIX_INDEXES.get(table, ()):
+                    self.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{col}_prefix ON {table} ("{col}")')
+                    self.conn.execute(f'CREATE INDEX IF NOT EXISTS idx_{table}_{col}_lower ON {table} (lower("{col}"))')
+
+    # Value conversion
+
+    @staticmethod
+    def _to_db(kind: str, value):
+        if value is None:
+            return None
+        if kind == 'json':
+            return json.dumps(value)
+        if kind == 'bool':
+            return 1 if value in (True, 'true', 1) else 0
+        if kind == 'int':
+            return int(value)
+        return str(value)
+
+    @staticmethod
+    def _from_db(kind: str, value):
+        if value is None:
+            return None
+        if kind == 'json':
+            return json.loads(value)
+        if kind == 'bool':
+            return bool(value)
+        return value
+
+    def _row(self, table: str, row: sqlite3.Row, cols: List[str]) -> dict:
+        types = TABLES[table]
+        return {col: self._from_db(types[col], row[col]) for col in cols}
+
+    # Query building
+
+    def _columns(self, table: str, select: str) -> List[str]:
+        if not select or select.strip() == '*':
+            return list(TABLES[table])
+        cols = [c.strip() for c in select.split(',') if c.strip()]
+        for col in cols:
+            if col not in TABLES[table] and col != 'count':
+                raise PostgrestError(400, '42703', f'column {table}.{col} does not exist')
+        return cols
+
+    def _where(self, table: str, filters: List[tuple]) -> tuple:
+        clauses, args = [], []
+        for col, expr in filters:
+            if col == 'or':
+                # or=(col.op.value,col.op.value); values may be double-quoted
+                parts = []
+                for cond in parse_list(expr):
+                    cond_col, sep, cond_expr = cond.partition('.')
+                    if not sep:
+                        raise PostgrestError(400, 'PGRST100', f'invalid or filter: {expr}')
+                    parts.append(self._clause(table, cond_col, cond_expr))
+                if not parts:
+                    raise PostgrestError(400, 'PGRST100', f'invalid or filter: {expr}')
+                clause = '(' + ' OR '.join(part for part, _ in parts) + ')'
+                part_args = [arg for _, values in parts for arg in values]
+            else:
+                clause, part_args = self._clause(table, col, expr)
+            clauses.append(clause)
+            args.extend(part_args)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', args
+
+    def _clause(self, table: str, col: str, expr: str) -> tuple:
+        """SQL condition and arguments for one col=op.value filter"""
+        types = TABLES[table]
+        if col not in types:
+            raise PostgrestError(400, '42703', f'column {table}.{col} does not exist')
+        args = []
+        negate = expr.startswith('not.')
+        if negate:
+            expr = expr[4:]
+        op, _, raw = expr.partition('.')
+        prefix = like_prefix(raw) if op in ('like', 'ilike') else None
+        if op == 'in':
+            values = parse_list(raw)
+            clause = f'"{col}" IN ({", ".join("?" * len(values))})' if values else '0'
+            args.extend(self._to_db(types[col], self._coerce(types[col], v)) for v in values)
+        elif op == 'is':
+            clause = f'"{col}" IS NULL' if raw == 'null' else f'"{col}" = ?'
+            if raw != 'null':
+                args.append(1 if raw == 'true' else 0)
+        elif prefix and self.prefix_indexes and col in PREFIX_INDEXES.get(table, ()):
+            # 'abc*' is the range ['abc', 'abd'), answered from the prefix index
+            column = f'lower("{col}")' if op == 'ilike' else f'"{col}"'
+            if op == 'ilike':
+                prefix = prefix.lower()
+            clause = f'{column} >= ? AND {column} < ?'
+            args.extend([prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)])
+        elif op in ('like', 'ilike'):
+            # SQLite's LIKE ignores ASCII case; backslash escapes a literal % or _
+            value = raw.replace('*', '%')
+            column = f'lower("{col}")' if op == 'ilike' else f'"{col}"'
+            clause = f"{column} LIKE ? ESCAPE '\\'"
+            args.append(value.lower() if op == 'ilike' else value)
+        elif op in OPERATORS:
+            clause = f'"{col}" {OPERATORS[op]} ?'
+            args.append(self._to_db(types[col], self._coerce(types[col], raw)))
+        else:
+            raise PostgrestError(400, 'PGRST100', f'unsupported operator: {op}')
+        return (f'NOT ({clause})' if negate else clause), args
+
+    @staticmethod
+    def _coerce(kind: str, raw: str):
+        if kind == 'bool':
+            return raw == 'true'
+        if kind == 'json':
+            return json.loads(raw)
+        return raw
+
+    @staticmethod
+    def _order(table: str, order: Optional[str]) -> str:
+        if not order:
+            return ''
+        parts = []
+        for item in order.split(','):
+            col, *mods = item.split('.')
+            if col not in TABLES[table]:
+                raise PostgrestError(400, '42703', f'column {table}.{col} does not exist')
+            direction = 'DESC' if 'desc' in mods else 'ASC'
+            nulls = ' NULLS FIRST' if 'nullsfirst' in mods else ' NULLS LAST' if 'nullslast' in mods else (
+                ' NULLS FIRST' if direction == 'DESC' else ' NULLS LAST')
+            parts.append(f'"{col}" {direction}{nulls}')
+        return ' ORDER BY ' + ', '.join(parts)
+
+    # Operations
+
+    def select(self, table: str, select: str, filters, order=None, limit=None, offset=None, count=False):
+        cols = self._columns(table, select)
+        where, args = self._where(table, filters)
+        with self.lock:
+            total = None
+            if count or cols == ['count']:
+                total = self.conn.execute(f'SELECT COUNT(*) FROM {table}{where}', args).fetchone()[0]
+            if cols == ['count']:
+                return [{'count': total}], total
+            sql = f'SELECT {", ".join(chr(34) + c + chr(34) for c in cols)} FROM {table}{where}{self._order(table, order)}'
+            if limit is not None or offset is not None:
+                sql += f' LIMIT {int(limit) if limit is not None else -1} OFFSET {int(offset or 0)}'
+            rows = self.conn.execute(sql, args).fetchall()
+        return [self._row(table, row, cols) for row in rows], total
+
+    def _prepare(self, table: str, record: dict) -> dict:
+        types = TABLES[table]
+        unknown = set(record) - set(types)
+        if unknown:
+            raise PostgrestError(400, 'PGRST204', f"Could not find the '{sorted(unknown)[0]}' column of '{table}'")
+        row = {**DEFAULTS.get(table, {}), **record}
+        row.setdefault('id', str(uuid.uuid4()))
+        stamp = now_iso()
+        for col in ('created_at', 'updated_at'):
+            if col in types:
+                row.setdefault(col, stamp)
+        if table == 'users' and not EMAIL_PATTERN.match(row.get('email') or ''):
+            raise PostgrestError(400, '23514', 'new row for relation "users" violates check constraint "check_valid_email"')
+        return row
+
+    def insert(self, table: str, records: List[dict], upsert_on: Optional[List[str]] = None,
+               ignore_duplicates: bool = False) -> List[dict]:
+        types = TABLES[table]
+        inserted_ids = []
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                for record in records:
+                    row = self._prepare(table, record)
+                    cols = list(row)
+                    values = [self._to_db(types[c], row[c]) for c in cols]
+                    sql = f'INSERT INTO {table} ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})'
+                    if upsert_on:
+                        updates = [c for c in record if c not in upsert_on and c != 'id']
+                        if table in TOUCH_ON_UPDATE and 'updated_at' not in updates:
+                            updates.append('updated_at')
+                        if ignore_duplicates or not updates:
+                            sql += f' ON CONFLICT ({", ".join(upsert_on)}) DO NOTHING'
+                        else:
+                            sql += f' ON CONFLICT ({", ".join(upsert_on)}) DO UPDATE SET ' + ', '.join(
+                                f'{c} = excluded.{c}' for c in updates)
+                    self.conn.execute(sql, values)
+                    key = ' AND '.join(f'{c} = ?' for c in (upsert_on or ['id']))
+                    found = self.conn.execute(f'SELECT id FROM {table} WHERE {key}',
+                                              [self._to_db(types[c], row[c]) for c in (upsert_on or ['id'])]).fetchone()
+                    if found:
+                        inserted_ids.append(found[0])
+                self.conn.execute('COMMIT')
+            except sqlite3.IntegrityError as e:
+                self.conn.execute('ROLLBACK')
+                raise PostgrestError(409, '23505', f'duplicate key value violates unique constraint ({e})')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+        return self._by_ids(table, inserted_ids)
+
+    def _by_ids(self, table: str, ids: List[str]) -> List[dict]:
+        if not ids:
+            return []
+        rows, _ = self.select(table, '*', [('id', 'in.(' + ','.join(f'"{i}"' for i in ids) + ')')])
+        order = {row_id: pos for pos, row_id in enumerate(ids)}
+        return sorted(rows, key=lambda row: order[row['id']])
+
+    def update(self, table: str, changes: dict, filters) -> List[dict]:
+        types = TABLES[table]
+        changes = dict(changes)
+        if table in TOUCH_ON_UPDATE:
+            changes['updated_at'] = now_iso()
+        for col in changes:
+            if col not in types:
+                raise PostgrestError(400, 'PGRST204', f"Could not find the '{col}' column of '{table}'")
+        if table == 'users' and 'email' in changes and not EMAIL_PATTERN.match(changes['email'] or ''):
+            raise PostgrestError(400, '23514', 'new row for relation "users" violates check constraint "check_valid_email"')
+        where, args = self._where(table, filters)
+        with self.lock:
+            ids = [row[0] for row in self.conn.execute(f'SELECT id FROM {table}{where}', args).fetchall()]
+            if ids:
+                assignments = ', '.join(f'"{c}" = ?' for c in changes)
+                values = [self._to_db(types[c], v) for c, v in changes.items()]
+                versioned = [c for c in VERSIONED_COLUMNS if c in changes]
+                if table == 'users' and versioned and 'version' not in changes:
+                    # SET expressions see the old row, like NEW vs OLD in the trigger
+                    unchanged = ' AND '.join(f'"{c}" IS ?' for c in versioned)
+                    assignments += f', "version" = "version" + (CASE WHEN {unchanged} THEN 0 ELSE 1 END)'
+                    values += [self._to_db(types[c], changes[c]) for c in versioned]
+                try:
+                    self.conn.execute(
+                        f'UPDATE {table} SET {assignments} WHERE id IN ({", ".join("?" * len(ids))})', values + ids)
+                except sqlite3.IntegrityError as e:
+                    raise PostgrestError(409, '23505', f'duplicate key value violates unique constraint ({e})')
+        return self._by_ids(table, ids)
+
+    def delete(self, table: str, filters) -> List[dict]:
+        where, args = self._where(table, filters)
+        with self.lock:
+            rows = self.conn.execute(f'SELECT * FROM {table}{where}', args).fetchall()
+            self.conn.execute(f'DELETE FROM {table}{where}', args)
+        return [self._row(table, row, list(TABLES[table])) for row in rows]
+
+    def reset(self) -> None:
+        with self.lock:
+            for table in TABLES:
+                self.conn.execute(f'DELETE FROM {table}')
+
+def like_prefix(pattern: str) -> Optional[str]:
+    """Literal prefix of an 'abc*' pattern, or None for any other shape"""
+    literal, i = [], 0
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\' and i + 1 < len(pattern):
+            literal.append(pattern[i + 1])
+            i += 2
+            continue
+        if ch in '*%':
+            return ''.join(literal) if literal and i == len(pattern) - 1 else None
+        if ch == '_':
+            return None
+        literal.append(ch)
+        i += 1
+    return None
+
+def parse_list(raw: str) -> List[str]:
+    """Parse a PostgREST list literal like ("a","b",c)"""
+    inner = raw.strip()
+    if inner.startswith('(') and inner.endswith(')'):
+        inner = inner[1:-1]
+    values, current, quoted, i = [], '', False, 0
+    while i < len(inner):
+        ch = inner[i]
+        if ch == '"':
+            quoted = not quoted
+        elif ch == '\\' and quoted and i + 1 < len(inner):
+            i += 1
+            current += inner[i]
+        elif ch == ',' and not quoted:
+            values.append(current)
+            current = ''
+        else:
+            current += ch
+        i += 1
+    if current or inner.endswith(','):
+        values.append(current)
+    return values
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """HTTP front end translating PostgREST requests into Store calls"""
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PostgRESTStandin/1.0'
+    # Headers and body go out in separate writes; Nagle would add ~40 ms per keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):  # keep load tests quiet
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status: int, payload=None, headers: Optional[dict] = None) -> None:
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else None
+
+    def _inject_faults(self) -> bool:
+        """Apply configured latency/error/timeout; return False when the request was consumed"""
+        faults = self.server.faults
+        rng = faults.next_rng()
+        delay = faults.sample_latency(rng)
+        if delay:
+            time.sleep(delay)
+        if faults.timeout_rate and rng.random() < faults.timeout_rate:
+            time.sleep(faults.timeout_s)
+            self.close_connection = True
+            return False
+        if faults.error_rate and rng.random() < faults.error_rate:
+            self._read_json()
+            self._send(faults.error_status, {'code': 'STANDIN', 'message': 'Injected failure', 'details': None, 'hint': None})
+            return False
+        return True
+
+    def _dispatch(self, method: str) -> None:
+        parts = urlsplit(self.path)
+        if parts.path.startswith('/__standin/'):
+            return self._control(method, parts.path[len('/__standin/'):])
+        if not parts.path.startswith('/rest/v1/'):
+            return self._send(404, {'code': 'PGRST000', 'message': 'Not found', 'details': None, 'hint': None})
+        table = parts.path[len('/rest/v1/'):].strip('/')
+        if table not in TABLES:
+            return self._send(404, {'code': '42P01', 'message': f'relation "public.{table}" does not exist',
+                                    'details': None, 'hint': None})
+        if not self._inject_faults():
+            return
+        if self.server.read_only and method not in ('GET', 'HEAD'):
+            self._read_json()
+            return self._send(405, {'code': '25006', 'message': f'cannot execute {method} in a read-only transaction',
+                                    'details': None, 'hint': None})
+
+        params = parse_qsl(parts.query, keep_blank_values=True)
+        options = {k: v for k, v in params if k in RESERVED_PARAMS}
+        filters = [(k, v) for k, v in params if k not in RESERVED_PARAMS]
+        prefer = self.headers.get('Prefer', '')
+        representation = 'return=representation' in prefer
+        single = 'vnd.pgrst.object' in (self.headers.get('Accept') or '')
+        store = self.server.store
+
+        try:
+            if method in ('GET', 'HEAD'):
+                limit, offset = options.get('limit'), options.get('offset')
+                range_header = self.headers.get('Range')
+                if range_header and limit is None:
+                    start, _, end = range_header.partition('-')
+                    offset, limit = int(start), int(end) - int(start) + 1
+                rows, total = store.select(table, options.get('select', '*'), filters, options.get('order'),
+                                           limit, offset, count='count=exact' in prefer)
+                first = int(offset or 0)
+                content_range = f'{first}-{first + len(rows) - 1}/{total if total is not None else "*"}' if rows \
+                    else f'*/{total if total is not None else "*"}'
+                return self._respond_rows(200, rows, single, {'Content-Range': content_range})
+            if method == 'POST':
+                payload = self._read_json()
+                records = payload if isinstance(payload, list) else [payload]
+                upsert_on = None
+                if 'resolution=' in prefer:
+                    upsert_on = [c.strip() for c in options.get('on_conflict', 'id').split(',')]
+                rows = store.insert(table, records, upsert_on, 'resolution=ignore-duplicates' in prefer)
+                rows = self._project(table, rows, options.get('select'))
+                return self._respond_rows(201, rows if representation else None, single)
+            if method == 'PATCH':
+                rows = store.update(table, self._read_json() or {}, filters)
+                rows = self._project(table, rows, options.get('select'))
+                return self._respond_rows(200 if representation else 204, rows if representation else None, single)
+            if method == 'DELETE':
+                # Clients may send a body with DELETE; drain it so keep-alive stays in sync
+                self._read_json()
+                rows = store.delete(table, filters)
+                rows = self._project(table, rows, options.get('select'))
+                return self._respond_rows(200 if representation else 204, rows if representation else None, single)
+            return self._send(405, {'code': 'PGRST000', 'message': 'Method not allowed', 'details': None, 'hint': None})
+        except PostgrestError as e:
+            return self._send(e.status, e.body)
+
+    def _project(self, table: str, rows: List[dict], select: Optional[str]) -> List[dict]:
+        if not select or select.strip() == '*':
+            return rows
+        cols = self.server.store._columns(table, select)
+        return [{col: row.get(col) for col in cols} for row in rows]
+
+    def _respond_rows(self, status: int, rows, single: bool, headers: Optional[dict] = None) -> None:
+        if rows is None:
+            return self._send(status, None, headers)
+        if single:
+            if len(rows) != 1:
+                return self._send(406, {'code': 'PGRST116', 'message': 'JSON object requested, multiple (or no) rows returned',
+                                        'details': f'The result contains {len(rows)} rows', 'hint': None})
+            return self._send(status, rows[0], headers)
+        return self._send(status, rows, headers)
+
+    def _control(self, method: str, action: str) -> None:
+        """Runtime knobs: GET/POST /__standin/faults, POST /__standin/reset"""
+        server = self.server
+        if action == 'faults' and method == 'POST':
+            settings = {**server.faults.as_dict(), **(self._read_json() or {})}
+            settings.pop('requests', None)
+            server.faults = Faults(**settings)
+        elif action == 'reset' and method == 'POST':
+            server.store.reset()
+        elif action != 'faults':
+            return self._send(404, {'message': 'unknown control action'})
+        return self._send(200, server.faults.as_dict())
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_HEAD(self):
+        self._dispatch('HEAD')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store: Store, faults: Faults, verbose: bool = False, read_only: bool = False):
+        super().__init__(address, StandinHandler)
+        self.store = store
+        self.faults = faults
+        self.verbose = verbose
+        # Read replicas reject writes like a hot standby does
+        self.read_only = read_only
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{"localhost" if host in ("0.0.0.0", "") else host}:{port}'
+
+def start_standin(port: int = 0, db: str = ':memory:', faults: Optional[Faults] = None,
+                  verbose: bool = False, store: Optional[Store] = None, read_only: bool = False) -> StandinServer:
+    """Start a stand-in on a background thread; port 0 picks a free port
+
+    Pass another stand-in's store with read_only=True to get a read replica of it.
+    """
+    server = StandinServer(('127.0.0.1', port), store or Store(db), faults or Faults(), verbose, read_only)
+    threading.Thread(target=server.serve_forever, name='postgrest-standin', daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Local PostgREST stand-in for the Space Explorer apps')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--db', default=':memory:', help='SQLite path (default: in memory)')
+    parser.add_argument('--latency', default='none',
+                        help='none | fixed:MS | uniform:LO:HI | normal:MEAN:SD | exponential:MEAN | '
+                             'lognormal:MU:SIGMA | pareto:SCALE:ALPHA')
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--timeout-rate', type=float, default=0.0)
+    parser.add_argument('--timeout-s', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=None, help='make injected faults reproducible')
+    parser.add_argument('--read-only', action='store_true', help='act as a read replica of --db (a file path)')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.error_rate, args.error_status, args.timeout_rate, args.timeout_s, args.seed)
+    server = StandinServer((args.host, args.port), Store(args.db), faults, args.verbose, args.read_only)
+    print(f'🛰️  PostgREST stand-in listening on {server.url} (db: {args.db}{", read-only" if args.read_only else ""})')
+    print(f'   faults: {json.dumps(faults.as_dict())}')
+    print(f'   export SUPABASE_URL={server.url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Space Explorer preference cache
+In-process cache of user_preferences rows, one entry per user, dropped on write.
+Like the profile cache, invalidations are recorded in the host's user marks so
+every worker drops entries created before a user's latest write.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from user_marks import user_marks
+
+PREFERENCE_CACHE_TTL = float(os.getenv('PREFERENCE_CACHE_TTL', '60'))
+PREFERENCE_CACHE_SIZE = int(os.getenv('PREFERENCE_CACHE_SIZE', '10000'))
+# Keys per get/set call; also bounds the size of the in (...) list and the upsert
+PREFERENCES_MAX_KEYS = int(os.getenv('PREFERENCES_MAX_KEYS', '100'))
+
+# preference_key is VARCHAR(100); keys stay safe inside a PostgREST in (...) list
+PREFERENCE_KEY_PATTERN = re.compile(r'^[A-Za-z0-9_.:-]{1,100}$')
+
+# Marks a key known to have no row, so repeated lookups of unset keys stay cached
+ABSENT = object()
+
+class PreferenceEntry:
+    """Known preference values of one user; complete when every key was loaded"""
+    __slots__ = ('values', 'complete', 'expires_at', 'created_at')
+
+    def __init__(self, expires_at: float):
+        self.values: Dict[str, object] = {}
+        self.complete = False
+        self.expires_at = expires_at
+        # Wall-clock creation time; values read into the entry are no older than this
+        self.created_at = time.time()
+
+    def missing(self, keys: Optional[Iterable[str]]) -> Optional[List[str]]:
+        """Keys that still need a query; None means the full set is needed"""
+        if self.complete:
+            return []
+        if keys is None:
+            return None
+        return [key for key in keys if key not in self.values]
+
+    def pick(self, keys: Optional[Iterable[str]]) -> dict:
+        """Stored values for the keys (all of them when keys is None), without unset keys"""
+        if keys is None:
+            return {key: value for key, value in self.values.items() if value is not ABSENT}
+        return {key: self.values[key] for key in keys if self.values.get(key, ABSENT) is not ABSENT}
+
+class PreferenceCache:
+    """Bounded LRU of PreferenceEntry objects with a per-entry TTL"""
+    MARK = 'preferences_changed'
+
+    def __init__(self, ttl: float = PREFERENCE_CACHE_TTL, max_size: int = PREFERENCE_CACHE_SIZE, marks=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        # Host-shared invalidation marks; None keeps invalidations to this process
+        self.marks = marks
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry(self, user_id) -> PreferenceEntry:
+        """Live entry for a user, created empty when missing, expired or invalidated by another worker"""
+        now = time.monotonic()
+        changed = self.marks.get(user_id, self.MARK) if self.marks is not None else None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry.expires_at >= now and (changed is None or changed <= entry.created_at):
+                self._entries.move_to_end(user_id)
+                return entry
+            # Readers fill the entry they were handed; invalidate() detaches it, so
+            # a query that raced a write can never repopulate the cache
+            entry = PreferenceEntry(now + self.ttl)
+            if self.ttl > 0 and self.max_size > 0:
+                self._entries[user_id] = entry
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return entry
+
+    def invalidate(self, user_id) -> None:
+        """Drop a user's entry after a write, here and in the other workers of the host"""
+        if self.marks is not None:
+            self.marks.set(user_id, self.MARK)
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+preference_cache = PreferenceCache(marks=user_marks)
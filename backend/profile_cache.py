@@ -0,0 +1,120 @@
+"""
+Space Explorer profile cache
+In-process cache of user rows shared by the profile and me endpoints.
+Invalidations are also recorded in the host's user marks, and a hit on an
+entry cached before its user's latest mark is a miss, so a write or an admin
+invalidation handled by one worker reaches every worker on the host.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from responses import dumps
+from user_marks import user_marks
+from user_record import UserRecord
+
+PROFILE_CACHE_TTL = float(os.getenv('PROFILE_CACHE_TTL', '30'))
+PROFILE_CACHE_SIZE = int(os.getenv('PROFILE_CACHE_SIZE', '10000'))
+
+def make_etag(representation: str, user) -> str:
+    """Strong ETag of a representation of a user row (record or dict): '<version>.<digest>'
+
+    The digest covers updated_at, so it changes on every write, logins included.
+    The version prefix changes only with the editable fields; If-Match on profile
+    updates is checked against it.
+    """
+    version = user.get('version')
+    raw = '|'.join('' if part is None else str(part)
+                   for part in (representation, user.get('id'), version, user.get('updated_at')))
+    digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    return digest if version is None else f'{version}.{digest}'
+
+def etag_version(etag: str) -> Optional[int]:
+    """Row version an ETag from make_etag was built from, or None"""
+    version, sep, _ = etag.partition('.')
+    return int(version) if sep and version.isdigit() else None
+
+class CacheEntry:
+    """Cached user record and its encoded bodies"""
+    __slots__ = ('user', 'expires_at', 'loaded_at', 'bodies')
+
+    def __init__(self, user: UserRecord, expires_at: float, loaded_at: float):
+        self.user = user
+        self.expires_at = expires_at
+        # Wall-clock time the row was read, compared with the user's changed mark
+        self.loaded_at = loaded_at
+        self.bodies = {}
+
+    def etag(self, representation: str) -> str:
+        """ETag of the given response representation of this row"""
+        return make_etag(representation, self.user)
+
+    def body(self, representation: str, build: Callable[[UserRecord], dict]) -> bytes:
+        """Encoded response body for a representation, serialized at most once"""
+        body = self.bodies.get(representation)
+        if body is None:
+            body = self.bodies[representation] = dumps(build(self.user))
+        return body
+
+class ProfileCache:
+    """Bounded LRU cache of user records with a per-entry TTL"""
+    MARK = 'profile_changed'
+
+    def __init__(self, ttl: float = PROFILE_CACHE_TTL, max_size: int = PROFILE_CACHE_SIZE, marks=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        # Host-shared invalidation marks; None keeps invalidations to this process
+        self.marks = marks
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id) -> Optional[CacheEntry]:
+        """Return the live entry for a user id, or None"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+        if self.marks is not None:
+            changed = self.marks.get(user_id, self.MARK)
+            if changed is not None and changed > entry.loaded_at:
+                with self._lock:
+                    if self._entries.get(user_id) is entry:
+                        del self._entries[user_id]
+                return None
+        return entry
+
+    def put(self, user: UserRecord, loaded_at: Optional[float] = None) -> CacheEntry:
+        """Store a user record, read at loaded_at (now unless given)"""
+        entry = CacheEntry(user, time.monotonic() + self.ttl, time.time() if loaded_at is None else loaded_at)
+        if self.ttl <= 0 or self.max_size <= 0:
+            return entry
+        with self._lock:
+            self._entries[user.id] = entry
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id) -> None:
+        """Drop a user's entry after a write, here and in the other workers of the host"""
+        if self.marks is not None:
+            self.marks.set(user_id, self.MARK)
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+profile_cache = ProfileCache(marks=user_marks)
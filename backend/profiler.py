@@ -0,0 +1,144 @@
+"""
+Space Explorer on-demand request profiler
+Samples the stacks of selected live requests into flame-graph (folded) files.
+Nothing is registered on the app unless PROFILER_ENABLED is set, so the
+disabled mode costs nothing per request.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from flask import Flask, abort, g, request, send_file
+
+from admin_auth import admin_authorized, require_admin
+from metrics import metrics
+from responses import json_response
+
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', 'false').lower() == 'true'
+PROFILER_SAMPLE_RATE = float(os.getenv('PROFILER_SAMPLE_RATE', '0'))
+PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', '5'))
+PROFILER_DIR = Path(os.getenv('PROFILER_DIR', 'logs/profiles'))
+PROFILER_MAX_FILES = int(os.getenv('PROFILER_MAX_FILES', '500'))
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+def _folded(frame) -> str:
+    """Root-first semicolon-joined stack, the input format of flamegraph.pl"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+class Sampler:
+    """Background thread sampling the stacks of the threads serving profiled requests"""
+
+    def __init__(self, interval_s: float):
+        self.interval_s = interval_s
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self.aggregate = Counter()
+
+    def start(self, thread_id: int) -> Counter:
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = stacks
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        return stacks
+
+    def stop(self, thread_id: int) -> Counter:
+        with self._lock:
+            stacks = self._active.pop(thread_id, Counter())
+        self.aggregate.update(stacks)
+        return stacks
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval_s)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, stacks in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        stacks[_folded(frame)] += 1
+
+sampler = Sampler(PROFILER_INTERVAL_MS / 1000)
+
+def _start_profile():
+    if admin_authorized(request.headers.get('X-Profile-Request')):
+        reason = 'header'
+    elif PROFILER_SAMPLE_RATE and random.random() < PROFILER_SAMPLE_RATE:
+        reason = 'sample'
+    else:
+        return
+    g.profile_started = time.perf_counter()
+    g.profile_reason = reason
+    g.profile_stacks = sampler.start(threading.get_ident())
+
+def _finish_profile(error=None):
+    if 'profile_stacks' not in g:
+        return
+    stacks = sampler.stop(threading.get_ident())
+    elapsed_ms = (time.perf_counter() - g.profile_started) * 1000
+    metrics.inc('profiled_requests', reason=g.profile_reason)
+    if not stacks:
+        return
+    route = (request.url_rule.rule if request.url_rule else request.path).strip('/').replace('/', '_') or 'root'
+    name = f'{time.strftime("%Y%m%dT%H%M%S")}-{request.method}-{route}-{int(elapsed_ms)}ms-{uuid.uuid4().hex[:6]}.folded'
+    PROFILER_DIR.mkdir(parents=True, exist_ok=True)
+    (PROFILER_DIR / name).write_text(''.join(f'{stack} {count}\n' for stack, count in stacks.items()))
+    _prune()
+
+def _prune() -> None:
+    files = sorted(PROFILER_DIR.glob('*.folded'))
+    for old in files[:max(0, len(files) - PROFILER_MAX_FILES)]:
+        old.unlink(missing_ok=True)
+
+def list_profiles():
+    """Admin: recent per-request profiles"""
+    require_admin()
+    files = sorted(PROFILER_DIR.glob('*.folded'), reverse=True) if PROFILER_DIR.exists() else []
+    return json_response({
+        'success': True,
+        'data': {
+            'sample_rate': PROFILER_SAMPLE_RATE,
+            'profiles': [{'name': f.name, 'bytes': f.stat().st_size} for f in files]
+        }
+    })
+
+def get_profile_file(name: str):
+    """Admin: one folded-stack file, ready for flamegraph.pl or speedscope"""
+    require_admin()
+    path = PROFILER_DIR / os.path.basename(name)
+    if path.suffix != '.folded' or not path.exists():
+        abort(404)
+    return send_file(path.resolve(), mimetype='text/plain')
+
+def aggregate_profile():
+    """Admin: folded stacks merged across every profiled request since startup"""
+    require_admin()
+    body = ''.join(f'{stack} {count}\n' for stack, count in sampler.aggregate.most_common())
+    return body, 200, {'Content-Type': 'text/plain; charset=utf-8'}
+
+def init_profiler(app: Flask) -> None:
+    """Register the profiling hooks and admin endpoints when enabled"""
+    if not PROFILER_ENABLED:
+        return
+    app.before_request(_start_profile)
+    app.teardown_request(_finish_profile)
+    app.add_url_rule('/admin/profiles', 'list_profiles', list_profiles, methods=['GET'])
+    app.add_url_rule('/admin/profiles/aggregate', 'aggregate_profile', aggregate_profile, methods=['GET'])
+    app.add_url_rule('/admin/profiles/<name>', 'get_profile_file', get_profile_file, methods=['GET'])
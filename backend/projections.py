@@ -0,0 +1,33 @@
+"""
+Space Explorer column projections
+Each route declares the exact users columns it reads from the datastore
+"""
+
+from typing import Dict, Tuple
+
+# Fields of the public profile representation
+PROFILE_COLUMNS = ('id', 'name', 'email', 'created_at', 'last_login', 'profile_data')
+
+PROJECTIONS: Dict[str, Tuple[str, ...]] = {
+    # Duplicate-email check before registration
+    'exists': ('id',),
+    # Credential check; profile_data is loaded only after a successful login
+    'login': ('id', 'email', 'name', 'password_hash', 'is_active'),
+    # Everything except the password hash
+    'me': ('id', 'email', 'name', 'is_active', 'created_at', 'updated_at', 'last_login', 'profile_data', 'version'),
+    # Public profile plus the row versions its ETag is built from
+    'profile': PROFILE_COLUMNS + ('updated_at', 'version'),
+    # Admin user search results
+    'search': ('id', 'email', 'name', 'is_active', 'created_at', 'last_login'),
+}
+
+_SELECTS = {name: ', '.join(cols) for name, cols in PROJECTIONS.items()}
+
+def columns(name: str) -> str:
+    """PostgREST select list for a named projection"""
+    return _SELECTS[name]
+
+def register_projection(name: str, cols: Tuple[str, ...]) -> None:
+    """Add or replace a projection"""
+    PROJECTIONS[name] = tuple(cols)
+    _SELECTS[name] = ', '.join(cols)
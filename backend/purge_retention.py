@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Space Explorer retention runner
+Purges expired user_sessions and old user_audit_log rows in small batches
+instead of the single unbounded DELETE in cleanup_expired_sessions() and
+cleanup_old_audit_logs(), so a large backlog never holds long locks or floods
+IO under live logins.
+
+Each batch selects the oldest ids below the cutoff from the timestamp index,
+starting at the previous batch's last timestamp (keyset, so index entries of
+rows already deleted are never walked again), and deletes them by id. Batches
+are paced to a rows-per-second budget. Between batches a probe times a login
+style point query (or GET --probe-url); when it slows down the pace is halved,
+and it recovers gradually once latency is back to normal.
+
+Usage:
+    python purge_retention.py                          # both jobs
+    python purge_retention.py --job audit --rows-per-s 500
+    python purge_retention.py --probe-url http://localhost:5000/health --dry-run
+"""
+
+import argparse
+import datetime
+import os
+import statistics
+import sys
+import time
+from typing import Callable, Optional
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
+
+RETENTION_AUDIT_DAYS = int(os.getenv('RETENTION_AUDIT_DAYS', '365'))
+# Sessions stay this long past expires_at, e.g. to investigate a refresh token replay
+RETENTION_SESSION_GRACE_S = int(os.getenv('RETENTION_SESSION_GRACE_S', '0'))
+RETENTION_BATCH = int(os.getenv('RETENTION_BATCH', '500'))
+RETENTION_ROWS_PER_S = float(os.getenv('RETENTION_ROWS_PER_S', '2000'))
+# Back off when the probe exceeds its baseline by this factor (or RETENTION_MAX_PROBE_MS)
+RETENTION_SLOW_FACTOR = float(os.getenv('RETENTION_SLOW_FACTOR', '2'))
+RETENTION_MAX_PROBE_MS = float(os.getenv('RETENTION_MAX_PROBE_MS', '250'))
+
+# PostgREST Prefer: return=minimal (postgrest.types.ReturnMethod.minimal)
+RETURN_MINIMAL = 'minimal'
+
+# job -> (table, timestamp column, cutoff for a given now)
+JOBS = {
+    'sessions': ('user_sessions', 'expires_at',
+                 lambda now: now - datetime.timedelta(seconds=RETENTION_SESSION_GRACE_S)),
+    'audit': ('user_audit_log', 'created_at',
+              lambda now: now - datetime.timedelta(days=RETENTION_AUDIT_DAYS)),
+}
+
+def create_client(url: str):
+    from supabase import create_client
+    return create_client(url, SUPABASE_SERVICE_KEY)
+
+class Pacer:
+    """Rows-per-second budget with multiplicative backoff and additive recovery"""
+
+    def __init__(self, rows_per_s: float):
+        self.budget = rows_per_s
+        self.rate = rows_per_s
+        self.floor = rows_per_s / 32
+        self._next = time.monotonic()
+
+    def slow_down(self) -> None:
+        self.rate = max(self.floor, self.rate / 2)
+
+    def speed_up(self) -> None:
+        self.rate = min(self.budget, self.rate + self.budget / 10)
+
+    def wait(self, rows: int) -> None:
+        """Sleep until the rows just deleted fit the current rate"""
+        self._next = max(self._next, time.monotonic() - 1) + rows / self.rate
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+class LatencyProbe:
+    """Smoothed latency of a cheap live query, compared with its baseline before the purge"""
+
+    def __init__(self, query: Callable[[], object], factor: float = RETENTION_SLOW_FACTOR,
+                 max_ms: float = RETENTION_MAX_PROBE_MS, samples: int = 5):
+        self.query = query
+        self.baseline = statistics.median(self.sample() for _ in range(samples))
+        # A few ms of jitter on a sub-millisecond baseline is not contention
+        self.threshold = min(max_ms, max(self.baseline * factor, self.baseline + 5))
+        self.smoothed = self.baseline
+
+    def sample(self) -> float:
+        started = time.perf_counter()
+        self.query()
+        return (time.perf_counter() - started) * 1000
+
+    def slow(self) -> bool:
+        self.smoothed = 0.7 * self.smoothed + 0.3 * self.sample()
+        return self.smoothed > self.threshold
+
+def db_probe(client) -> Callable[[], object]:
+    """The indexed point lookup every login starts with"""
+    return lambda: client.table('users').select('id').eq('email', 'retention-probe@example.com').limit(1).execute()
+
+def url_probe(url: str) -> Callable[[], object]:
+    import requests
+    session = requests.Session()
+    return lambda: session.get(url, timeout=10)
+
+def count_expired(client, table: str, column: str, cutoff: str) -> int:
+    return client.table(table).select('id', count='exact').lt(column, cutoff).limit(1).execute().count or 0
+
+def purge(client, job: str, batch: int, pacer: Pacer, probe: Optional[LatencyProbe],
+          now: Optional[datetime.datetime] = None, report_every_s: float = 5.0) -> int:
+    """Delete a job's rows below its cutoff in paced batches; returns rows deleted"""
+    table, column, cutoff_for = JOBS[job]
+    cutoff = cutoff_for(now or datetime.datetime.now(datetime.timezone.utc)).isoformat()
+    total = count_expired(client, table, column, cutoff)
+    print(f'{job}: {total} rows in {table} with {column} < {cutoff}', flush=True)
+
+    deleted, cursor, previous = 0, None, None
+    started = reported = time.monotonic()
+    while True:
+        query = client.table(table).select(f'id,{column}').lt(column, cutoff).order(column).limit(batch)
+        if cursor is not None:
+            query = query.gte(column, cursor)
+        rows = query.execute().data
+        if not rows:
+            break
+        ids = [row['id'] for row in rows]
+        if ids == previous:
+            print(f'{job}: the last batch was not deleted, stopping', file=sys.stderr, flush=True)
+            break
+        client.table(table).delete(returning=RETURN_MINIMAL).in_('id', ids).execute()
+        deleted += len(ids)
+        cursor, previous = rows[-1][column], ids
+
+        if probe is not None:
+            if probe.slow():
+                pacer.slow_down()
+            else:
+                pacer.speed_up()
+        if time.monotonic() - reported >= report_every_s or len(rows) < batch:
+            reported = time.monotonic()
+            elapsed = reported - started
+            probe_note = f', probe {probe.smoothed:.1f}/{probe.threshold:.1f} ms' if probe else ''
+            print(f'{job}: {deleted}/{total} deleted ({deleted / max(total, 1):.0%}), '
+                  f'{deleted / elapsed if elapsed else 0:.0f} rows/s, pace {pacer.rate:.0f} rows/s{probe_note}', flush=True)
+        if len(rows) < batch:
+            break
+        pacer.wait(len(ids))
+    return deleted
+
+def main():
+    parser = argparse.ArgumentParser(description='Purge expired sessions and old audit rows in paced batches')
+    parser.add_argument('--job', choices=sorted(JOBS) + ['all'], default='all')
+    parser.add_argument('--batch', type=int, default=RETENTION_BATCH, help='rows deleted per statement')
+    parser.add_argument('--rows-per-s', type=float, default=RETENTION_ROWS_PER_S, help='deletion budget')
+    parser.add_argument('--probe-url', default='', help='time GET requests to this URL instead of a database query')
+    parser.add_argument('--no-probe', action='store_true', help='keep a fixed pace')
+    parser.add_argument('--dry-run', action='store_true', help='only count the rows that would be deleted')
+    args = parser.parse_args()
+
+    if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        sys.exit('SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set')
+
+    client = create_client(SUPABASE_URL)
+    jobs = sorted(JOBS) if args.job == 'all' else [args.job]
+    if args.dry_run:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        for job in jobs:
+            table, column, cutoff_for = JOBS[job]
+            cutoff = cutoff_for(now).isoformat()
+            print(f'{job}: {count_expired(client, table, column, cutoff)} rows in {table} with {column} < {cutoff}')
+        return
+
+    probe = None
+    if not args.no_probe:
+        probe = LatencyProbe(url_probe(args.probe_url) if args.probe_url else db_probe(client))
+        print(f'probe baseline {probe.baseline:.1f} ms, backing off above {probe.threshold:.1f} ms', flush=True)
+    started = time.monotonic()
+    deleted = {job: purge(client, job, args.batch, Pacer(args.rows_per_s), probe) for job in jobs}
+    print(f'✅ Deleted {", ".join(f"{count} {job}" for job, count in deleted.items())} '
+          f'in {time.monotonic() - started:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Space Explorer shard rebalancer
+Moves users whose email now hashes to a different shard while the apps keep
+serving. Deploy the apps with the new SUPABASE_SHARDS and the old map in
+SUPABASE_SHARDS_PREVIOUS (logins then check both homes), run this, and drop
+SUPABASE_SHARDS_PREVIOUS once it reports no users left to move.
+
+Each batch copies rows to their new shard, together with the users'
+user_preferences and user_sessions (both cascade when a user row is deleted),
+repoints the id -> shard directory, waits out the workers' directory cache
+TTL, copies again any row updated on the old shard meanwhile, and only then
+deletes the old copies.
+
+Usage:
+    SUPABASE_SHARDS=a=https://a.example,b=https://b.example python rebalance_shards.py --batch 500
+    python rebalance_shards.py --dry-run
+    python rebalance_shards.py --rebuild-directory
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Iterator, List
+
+from sharding import SHARD_DIRECTORY_TTL_S, SUPABASE_SHARDS, HashRing, ShardDirectory, normalize_email
+
+SUPABASE_URL = os.getenv('SUPABASE_URL', '')
+SUPABASE_SERVICE_KEY = os.getenv('SUPABASE_SERVICE_ROLE_KEY', '')
+
+def create_client(url: str):
+    from supabase import create_client
+    return create_client(url, SUPABASE_SERVICE_KEY)
+
+def scan_users(client, batch: int) -> Iterator[List[dict]]:
+    """Full user rows in pages, keyset-paginated by id"""
+    cursor = None
+    while True:
+        query = client.table('users').select('*').order('id').limit(batch)
+        if cursor is not None:
+            query = query.gt('id', cursor)
+        rows = query.execute().data
+        if rows:
+            yield rows
+        if len(rows) < batch:
+            return
+        cursor = rows[-1]['id']
+
+# Per-user rows that live on the user's shard: table -> upsert conflict target
+DEPENDENT_TABLES = {
+    'user_preferences': 'user_id,preference_key',
+    'user_sessions': 'id',
+}
+
+def scan_dependents(client, table: str, user_ids: List[str], batch: int = 1000) -> List[dict]:
+    """Every row of a dependent table for some users, keyset-paginated by id"""
+    rows, cursor = [], None
+    while True:
+        query = client.table(table).select('*').in_('user_id', user_ids).order('id').limit(batch)
+        if cursor is not None:
+            query = query.gt('id', cursor)
+        page = query.execute().data
+        rows.extend(page)
+        if len(page) < batch:
+            return rows
+        cursor = page[-1]['id']
+
+def copy_dependents(clients: Dict[str, object], source: str, target: str, user_ids: List[str]) -> Dict[str, set]:
+    """Upsert the users' dependent rows from source to target; returns the ids copied per table"""
+    copied = {}
+    for table, conflict in DEPENDENT_TABLES.items():
+        rows = scan_dependents(clients[source], table, user_ids)
+        if rows:
+            clients[target].table(table).upsert(rows, on_conflict=conflict).execute()
+        copied[table] = {row['id'] for row in rows}
+    return copied
+
+def settle(clients: Dict[str, object], source: str, copied: Dict[str, List[dict]],
+           dependents: Dict[str, Dict[str, set]]) -> int:
+    """Re-copy rows updated on the source since they were copied, then delete them there"""
+    recopied = 0
+    for target, rows in copied.items():
+        ids = [row['id'] for row in rows]
+        copied_at = {row['id']: row['updated_at'] for row in rows}
+        current = clients[source].table('users').select('*').in_('id', ids).execute().data
+        changed = [row for row in current if (row['updated_at'] or '') > (copied_at[row['id']] or '')]
+        if changed:
+            clients[target].table('users').upsert(changed, on_conflict='id').execute()
+            recopied += len(changed)
+        # Preferences and sessions are copied again in full; rows deleted on the source since
+        # the first copy (a logout, a revoked session) are deleted from the target too
+        current_dependents = copy_dependents(clients, source, target, ids)
+        for table, first_copy in dependents[target].items():
+            gone = list(first_copy - current_dependents[table])
+            if gone:
+                clients[target].table(table).delete().in_('id', gone).execute()
+        # Deleting the users cascades to their preferences and sessions on the source
+        clients[source].table('users').delete().in_('id', ids).execute()
+    return recopied
+
+def rebalance(clients: Dict[str, object], directory: ShardDirectory, batch: int, grace_s: float,
+              pause_s: float = 0.0, dry_run: bool = False) -> Dict[str, int]:
+    """Move every user to the shard its email hashes to; returns counts"""
+    ring = HashRing(clients)
+    totals = {'scanned': 0, 'moved': 0, 'recopied': 0}
+    for source, client in clients.items():
+        for rows in scan_users(client, batch):
+            copied = defaultdict(list)
+            for row in rows:
+                target = ring.shard_for(normalize_email(row['email']))
+                if target != source:
+                    copied[target].append(row)
+            moving = sum(len(group) for group in copied.values())
+            totals['scanned'] += len(rows)
+            totals['moved'] += moving
+            if moving and not dry_run:
+                dependents = {}
+                for target, group in copied.items():
+                    clients[target].table('users').upsert(group, on_conflict='id').execute()
+                    dependents[target] = copy_dependents(clients, source, target, [row['id'] for row in group])
+                    directory.assign_many([(row['id'], target) for row in group])
+                # Workers may still route these ids to the source until their cached entry expires
+                time.sleep(grace_s)
+                totals['recopied'] += settle(clients, source, copied, dependents)
+            print(f'{source}: scanned {len(rows)}, {"would move" if dry_run else "moved"} {moving} '
+                  f'(total {totals["moved"]}/{totals["scanned"]})', flush=True)
+            if pause_s:
+                time.sleep(pause_s)
+    return totals
+
+def rebuild_directory(clients: Dict[str, object], directory: ShardDirectory, batch: int) -> int:
+    """Point the directory at wherever each user currently lives"""
+    assigned = 0
+    for name, client in clients.items():
+        for rows in scan_users(client, batch):
+            directory.assign_many([(row['id'], name) for row in rows])
+            assigned += len(rows)
+        print(f'{name}: directory has {assigned} users so far', flush=True)
+    return assigned
+
+def main():
+    parser = argparse.ArgumentParser(description='Move users to the shard their email hashes to')
+    parser.add_argument('--batch', type=int, default=500, help='users read per page')
+    parser.add_argument('--grace', type=float, default=SHARD_DIRECTORY_TTL_S + 1,
+                        help='seconds between repointing the directory and deleting old copies')
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between batches')
+    parser.add_argument('--dry-run', action='store_true', help='only count the users that would move')
+    parser.add_argument('--rebuild-directory', action='store_true',
+                        help='record every user where it currently lives, moving nothing')
+    args = parser.parse_args()
+
+    if not SUPABASE_SHARDS or not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
+        sys.exit('SUPABASE_SHARDS, SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY must be set')
+
+    clients = {name: create_client(url) for name, url in SUPABASE_SHARDS.items()}
+    directory = ShardDirectory(create_client(SUPABASE_URL))
+    started = time.monotonic()
+    if args.rebuild_directory:
+        assigned = rebuild_directory(clients, directory, args.batch)
+        print(f'✅ Directory rebuilt for {assigned} users in {time.monotonic() - started:.1f}s')
+        return
+    totals = rebalance(clients, directory, args.batch, args.grace, args.pause, args.dry_run)
+    print(f'✅ {totals["moved"]} of {totals["scanned"]} users {"to move" if args.dry_run else "moved"} '
+          f'({totals["recopied"]} copied again after concurrent updates) '
+          f'in {time.monotonic() - started:.1f}s')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Space Explorer response helpers
+Fast JSON encoding and pre-encoded static responses shared by the Flask apps
+"""
+
+import datetime
+import json
+import os
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+def _default(value):
+    """Encode values the standard encoders do not know about"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    as_json = getattr(value, 'as_json', None)
+    if as_json is not None:
+        return as_json()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+if orjson is not None and os.getenv('JSON_ENCODER', 'auto') != 'json':
+    JSON_ENCODER = 'orjson'
+
+    def dumps(payload) -> bytes:
+        """Serialize a payload to UTF-8 JSON bytes"""
+        return orjson.dumps(payload, default=_default)
+
+    loads = orjson.loads
+else:
+    JSON_ENCODER = 'json'
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+    def dumps(payload) -> bytes:
+        """Serialize a payload to UTF-8 JSON bytes"""
+        return _encoder.encode(payload).encode('utf-8')
+
+    loads = json.loads
+
+def body_response(body: bytes, status: int = 200) -> Response:
+    """Wrap already-encoded JSON bytes in a response"""
+    return Response(body, status=status, mimetype='application/json')
+
+def json_response(payload, status: int = 200) -> Response:
+    """Encode a payload with the fast encoder and wrap it in a response"""
+    return Response(dumps(payload), status=status, mimetype='application/json')
+
+class StaticResponse:
+    """JSON response whose body is encoded once at startup"""
+    __slots__ = ('body', 'status')
+
+    def __init__(self, payload: dict, status: int):
+        self.body = dumps(payload)
+        self.status = status
+
+    def __call__(self) -> Response:
+        return Response(self.body, status=self.status, mimetype='application/json')
+
+def static_error(status: int, message: str, code: str) -> StaticResponse:
+    """Pre-encode a constant error body"""
+    return StaticResponse({
+        'success': False,
+        'message': message,
+        'code': code
+    }, status)
+
+# Pre-encoded error responses shared by the apps
+INVALID_TOKEN_FORMAT = static_error(401, 'Invalid token format', 'INVALID_TOKEN_FORMAT')
+MISSING_TOKEN = static_error(401, 'Token is missing', 'MISSING_TOKEN')
+MISSING_FIELD = {
+    field: static_error(400, f'{field} is required', 'MISSING_FIELD')
+    for field in ('name', 'email', 'password')
+}
+MISSING_CREDENTIALS = static_error(400, 'Email and password are required', 'MISSING_CREDENTIALS')
+USER_EXISTS = static_error(409, 'User with this email already exists', 'USER_EXISTS')
+CREATION_FAILED = static_error(500, 'Failed to create user', 'CREATION_FAILED')
+REGISTRATION_ERROR = static_error(500, 'Registration failed', 'REGISTRATION_ERROR')
+INVALID_CREDENTIALS = static_error(401, 'Invalid email or password', 'INVALID_CREDENTIALS')
+ACCOUNT_DEACTIVATED = static_error(401, 'Account is deactivated', 'ACCOUNT_DEACTIVATED')
+LOGIN_ERROR = static_error(500, 'Login failed', 'LOGIN_ERROR')
+USER_NOT_FOUND = static_error(404, 'User not found', 'USER_NOT_FOUND')
+PROFILE_ERROR = static_error(500, 'Failed to get user profile', 'PROFILE_ERROR')
+PROFILE_NOT_FOUND = static_error(404, 'Profile not found', 'PROFILE_NOT_FOUND')
+GET_PROFILE_ERROR = static_error(500, 'Failed to get profile', 'PROFILE_ERROR')
+UPDATE_FAILED = static_error(500, 'Failed to update profile', 'UPDATE_FAILED')
+UPDATE_ERROR = static_error(500, 'Failed to update profile', 'UPDATE_ERROR')
+INVALID_PREFERENCES = static_error(400, 'preferences must be a non-empty object of valid keys', 'INVALID_PREFERENCES')
+INVALID_PREFERENCE_KEYS = static_error(400, 'keys must be a comma-separated list of valid preference keys', 'INVALID_PREFERENCE_KEYS')
+PREFERENCES_ERROR = static_error(500, 'Failed to get preferences', 'PREFERENCES_ERROR')
+PREFERENCES_UPDATE_ERROR = static_error(500, 'Failed to update preferences', 'PREFERENCES_UPDATE_ERROR')
+INVALID_SEARCH = static_error(400, 'q must be 1-100 characters (3+ for substring matches) and match prefix or substring', 'INVALID_SEARCH')
+SEARCH_ERROR = static_error(500, 'User search failed', 'SEARCH_ERROR')
+INVALID_USER_IDS = static_error(400, 'ids must be a non-empty list of at most 1000 user ids', 'INVALID_USER_IDS')
+NOT_FOUND = static_error(404, 'API endpoint not found', 'NOT_FOUND')
+INTERNAL_ERROR = static_error(500, 'Internal server error', 'INTERNAL_ERROR')
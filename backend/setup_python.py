@@ -59,10 +59,16 @@ def create_directories():
         Path(directory).mkdir(exist_ok=True)
         print(f"✅ Directory '{directory}' created/verified")
 
-def test_backend():
+def test_backend(local=False):
     """Test the backend configuration"""
     print("🧪 Testing backend configuration...")
     try:
+        if local:
+            # Use the SQLite-backed PostgREST stand-in instead of the live project
+            from postgrest_standin import start_standin
+            os.environ['SUPABASE_URL'] = start_standin().url
+            print(f"✅ Local stand-in started at {os.environ['SUPABASE_URL']}")
+        
         # Test imports
         from app import app, supabase
         print("✅ All imports successful")
@@ -99,8 +105,8 @@ def main():
     # Create directories
     create_directories()
     
-    # Test backend
-    if test_backend():
+    # Test backend (--local runs against the offline stand-in)
+    if test_backend(local='--local' in sys.argv):
         print("\n🎉 Backend setup completed successfully!")
         print("\nNext steps:")
         print("1. Run the SQL schema in your Supabase dashboard:")
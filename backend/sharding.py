@@ -0,0 +1,157 @@
+"""
+Space Explorer user sharding
+Optional mode that spreads users over several datastores. A consistent-hash
+ring places each user by normalized email, and a small id -> shard directory
+answers id-based lookups (/me, profile) without asking every shard.
+"""
+
+import bisect
+import datetime
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics import metrics
+
+def parse_shards(spec: str) -> Dict[str, str]:
+    """Parse 'name=url,name=url' into an ordered name -> PostgREST base URL map"""
+    shards = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, sep, url = item.partition('=')
+        if not sep or not name.strip() or not url.strip():
+            raise ValueError(f'invalid shard entry {item!r}, expected name=url')
+        shards[name.strip()] = url.strip()
+    return shards
+
+# Shards users are placed on; empty keeps the single SUPABASE_URL datastore
+SUPABASE_SHARDS = parse_shards(os.getenv('SUPABASE_SHARDS', ''))
+# Shard map before the rebalance in progress; email lookups also try the old home
+SUPABASE_SHARDS_PREVIOUS = parse_shards(os.getenv('SUPABASE_SHARDS_PREVIOUS', ''))
+SHARD_VNODES = int(os.getenv('SHARD_VNODES', '128'))
+SHARD_DIRECTORY_CACHE_SIZE = int(os.getenv('SHARD_DIRECTORY_CACHE_SIZE', '100000'))
+# Bounds how long a worker may keep routing a moved user to its old shard
+SHARD_DIRECTORY_TTL_S = float(os.getenv('SHARD_DIRECTORY_TTL_S', '30'))
+
+DIRECTORY_TABLE = 'user_shards'
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def _point(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+class HashRing:
+    """Consistent-hash ring; adding a shard only moves the keys it takes over"""
+
+    def __init__(self, shards: Iterable[str], vnodes: int = SHARD_VNODES):
+        points = sorted((_point(f'{shard}#{i}'), shard) for shard in shards for i in range(vnodes))
+        if not points:
+            raise ValueError('a hash ring needs at least one shard')
+        self._keys = [point for point, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    def shard_for(self, key: str) -> str:
+        index = bisect.bisect(self._keys, _point(key))
+        return self._shards[index % len(self._shards)]
+
+class ShardDirectory:
+    """user id -> shard name, stored in the user_shards table with an in-process LRU in front"""
+
+    def __init__(self, client, size: int = SHARD_DIRECTORY_CACHE_SIZE, ttl_s: float = SHARD_DIRECTORY_TTL_S):
+        self.client = client
+        self.size = size
+        self.ttl_s = ttl_s
+        self._entries: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, user_id: str) -> Optional[str]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                metrics.inc('shard_directory_lookups', result='hit')
+                return entry[0]
+        metrics.inc('shard_directory_lookups', result='miss')
+        rows = self.client.table(DIRECTORY_TABLE).select('shard').eq('id', user_id).execute().data
+        if not rows:
+            return None
+        self._remember(user_id, rows[0]['shard'])
+        return rows[0]['shard']
+
+    def assign(self, user_id: str, shard: str) -> None:
+        self.assign_many([(user_id, shard)])
+
+    def assign_many(self, pairs: List[Tuple[str, str]]) -> None:
+        """Record (user id, shard) pairs in one upsert"""
+        if not pairs:
+            return
+        stamp = datetime.datetime.utcnow().isoformat()
+        self.client.table(DIRECTORY_TABLE).upsert(
+            [{'id': user_id, 'shard': shard, 'updated_at': stamp} for user_id, shard in pairs],
+            on_conflict='id'
+        ).execute()
+        for user_id, shard in pairs:
+            self._remember(user_id, shard)
+
+    def _remember(self, user_id: str, shard: str) -> None:
+        with self._lock:
+            self._entries[user_id] = (shard, time.monotonic() + self.ttl_s)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class Shard:
+    """One datastore's query routers: users_db (service role) and public_db (anon)"""
+    __slots__ = ('name', 'users_db', 'public_db')
+
+    def __init__(self, name: str, users_db, public_db):
+        self.name = name
+        self.users_db = users_db
+        self.public_db = public_db
+
+class ShardSet:
+    """Places users on shards by email hash and finds them again by email or id"""
+
+    def __init__(self, shards: Dict[str, Shard], directory: ShardDirectory,
+                 previous: Iterable[str] = ()):
+        self.shards = shards
+        self.directory = directory
+        self.ring = HashRing(shards)
+        previous = [name for name in previous if name in shards]
+        self.previous_ring = HashRing(previous) if previous else None
+
+    def home(self, email: str) -> Shard:
+        """Shard a new user with this email is created on"""
+        return self.shards[self.ring.shard_for(normalize_email(email))]
+
+    def candidates(self, email: str) -> List[Shard]:
+        """Shards that may hold this email: its home, then its pre-rebalance home"""
+        key = normalize_email(email)
+        names = [self.ring.shard_for(key)]
+        if self.previous_ring is not None:
+            old = self.previous_ring.shard_for(key)
+            if old != names[0]:
+                names.append(old)
+        return [self.shards[name] for name in names]
+
+    def for_user(self, user_id: str) -> Shard:
+        """Shard holding a user id, from the directory or, failing that, by asking every shard"""
+        name = self.directory.lookup(user_id)
+        if name in self.shards:
+            return self.shards[name]
+        metrics.inc('shard_directory_lookups', result='fanout')
+        for shard in self.shards.values():
+            if shard.users_db.write().table('users').select('id').eq('id', user_id).limit(1).execute().data:
+                self.directory.assign(user_id, shard.name)
+                return shard
+        # Unknown ids resolve anywhere; the query that follows finds nothing
+        return next(iter(self.shards.values()))
@@ -4,11 +4,13 @@ Space Explorer Python Backend Test Script
 Tests the Flask backend API endpoints
 """
 
+import os
 import requests
 import json
 import sys
 
-BASE_URL = "http://localhost:5000"
+# Point at any running app, e.g. one started against postgrest_standin.py
+BASE_URL = os.getenv("API_BASE_URL", "http://localhost:5000")
 
 def test_health():
     """Test health endpoint"""
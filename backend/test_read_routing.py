@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Space Explorer read routing tests
+Checks the read-your-writes decision of ReadRouter when the write and the next
+read are handled by different worker processes sharing USER_MARKS_PATH.
+
+Usage:
+    python -m pytest -q test_read_routing.py
+"""
+
+import os
+import subprocess
+import sys
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# One request in a fresh worker process: optionally write, then route a read of the user
+WORKER = '''
+import sys
+from db_routing import ReadRouter, recent_writes
+action, user_id = sys.argv[1:]
+if action == 'write':
+    recent_writes.mark(user_id)
+print(ReadRouter('admin', 'primary', ['replica']).read(user_id))
+'''
+
+def route_in_worker(marks_path: str, action: str, user_id: str, window_s: str = '5') -> str:
+    env = dict(os.environ, USER_MARKS_PATH=marks_path, READ_YOUR_WRITES_WINDOW_S=window_s)
+    result = subprocess.run([sys.executable, '-c', WORKER, action, user_id], env=env, cwd=BACKEND_DIR,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip()
+
+def test_write_pins_reads_served_by_another_worker(tmp_path):
+    marks_path = str(tmp_path / 'marks.db')
+    user_id, other_id = str(uuid.uuid4()), str(uuid.uuid4())
+    assert route_in_worker(marks_path, 'read', user_id) == 'replica'
+    assert route_in_worker(marks_path, 'write', user_id) == 'primary'
+    assert route_in_worker(marks_path, 'read', user_id) == 'primary'
+    assert route_in_worker(marks_path, 'read', other_id) == 'replica'
+
+def test_pin_ends_with_the_window(tmp_path):
+    marks_path = str(tmp_path / 'marks.db')
+    user_id = str(uuid.uuid4())
+    route_in_worker(marks_path, 'write', user_id, window_s='0')
+    assert route_in_worker(marks_path, 'read', user_id, window_s='0') == 'replica'
+
+def test_reads_without_replicas_use_the_primary():
+    from db_routing import ReadRouter
+    assert ReadRouter('admin', 'primary').read(str(uuid.uuid4())) == 'primary'
+
+def test_reads_without_a_user_use_a_replica():
+    from db_routing import ReadRouter, recent_writes
+    user_id = str(uuid.uuid4())
+    recent_writes.mark(user_id)
+    router = ReadRouter('admin', 'primary', ['replica'])
+    assert router.read() == 'replica'
+    assert router.read(user_id) == 'primary'
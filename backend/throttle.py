@@ -0,0 +1,227 @@
+"""
+Space Explorer login throttling
+Token buckets keyed by client IP and normalized email that turn away floods of
+login and registration attempts before any database query or bcrypt work.
+Buckets live in a sharded in-process store, or in a SQLite file shared by the
+workers of one host when THROTTLE_STORE_PATH is set.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from itertools import count
+from typing import Optional
+
+from flask import make_response, request
+
+from metrics import metrics
+from responses import static_error
+from sharding import normalize_email
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_ENABLED = os.getenv('THROTTLE_ENABLED', 'true').lower() not in ('0', 'false', 'no')
+THROTTLE_IP_PER_MINUTE = float(os.getenv('THROTTLE_IP_PER_MINUTE', '60'))
+THROTTLE_IP_BURST = float(os.getenv('THROTTLE_IP_BURST', '20'))
+THROTTLE_ACCOUNT_PER_MINUTE = float(os.getenv('THROTTLE_ACCOUNT_PER_MINUTE', '6'))
+THROTTLE_ACCOUNT_BURST = float(os.getenv('THROTTLE_ACCOUNT_BURST', '5'))
+THROTTLE_SHARDS = int(os.getenv('THROTTLE_SHARDS', '64'))
+THROTTLE_MAX_KEYS = int(os.getenv('THROTTLE_MAX_KEYS', '100000'))
+# SQLite file shared by the workers of one host; empty keeps buckets per worker
+THROTTLE_STORE_PATH = os.getenv('THROTTLE_STORE_PATH', '')
+# Reverse proxies in front of the app whose X-Forwarded-For entry can be trusted
+THROTTLE_PROXY_HOPS = int(os.getenv('THROTTLE_PROXY_HOPS', '0'))
+
+RATE_LIMITED = static_error(429, 'Too many attempts, please try again later', 'RATE_LIMIT_EXCEEDED')
+
+class Limit:
+    """Bucket size and refill rate for one kind of key"""
+    __slots__ = ('scope', 'rate', 'burst')
+
+    def __init__(self, scope: str, per_minute: float, burst: float):
+        self.scope = scope
+        self.rate = per_minute / 60.0
+        self.burst = max(1.0, burst)
+
+    @property
+    def refill_s(self) -> float:
+        """Seconds for an empty bucket to fill up again"""
+        return self.burst / self.rate
+
+IP_LIMIT = Limit('ip', THROTTLE_IP_PER_MINUTE, THROTTLE_IP_BURST)
+ACCOUNT_LIMIT = Limit('account', THROTTLE_ACCOUNT_PER_MINUTE, THROTTLE_ACCOUNT_BURST)
+
+def _refill(tokens: float, elapsed: float, limit: Limit) -> float:
+    return min(limit.burst, tokens + max(0.0, elapsed) * limit.rate)
+
+class _Shard:
+    __slots__ = ('lock', 'buckets')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [tokens, monotonic time of the last update], least recently used first
+        self.buckets = OrderedDict()
+
+class MemoryBucketStore:
+    """Token buckets spread over independently locked LRU shards"""
+    backend = 'memory'
+
+    def __init__(self, shards: int = THROTTLE_SHARDS, max_keys: int = THROTTLE_MAX_KEYS):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._per_shard = max(1, max_keys // len(self._shards))
+
+    def _shard(self, key: str) -> _Shard:
+        return self._shards[hash(key) % len(self._shards)]
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Spend one token; returns 0 when allowed, else seconds until a token is due"""
+        now = time.monotonic()
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                tokens = limit.burst
+            else:
+                shard.buckets.move_to_end(key)
+                tokens = _refill(bucket[0], now - bucket[1], limit)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            if not wait:
+                tokens -= 1
+            if bucket is None:
+                shard.buckets[key] = [tokens, now]
+                # The least recently used bucket has refilled the longest, so dropping it is the cheapest error
+                if len(shard.buckets) > self._per_shard:
+                    shard.buckets.popitem(last=False)
+            else:
+                bucket[0], bucket[1] = tokens, now
+            return wait
+
+    def give(self, key: str, limit: Limit) -> None:
+        """Return a token spent by an attempt that turned out legitimate"""
+        shard = self._shard(key)
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is not None:
+                bucket[0] = min(limit.burst, bucket[0] + 1)
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+class SharedBucketStore:
+    """Token buckets in a SQLite file, updated atomically by every worker on the host"""
+    backend = 'sqlite'
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, idle_s: float):
+        self.path = path
+        # Buckets untouched this long are full again, the same as having no row
+        self.idle_s = idle_s
+        self._local = threading.local()
+        self._calls = count(1)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS throttle_buckets '
+                         '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL) WITHOUT ROWID')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, limit: Limit) -> float:
+        """Spend one token; returns 0 when allowed, else seconds until a token is due"""
+        now = time.time()
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM throttle_buckets WHERE key = ?', (key,)).fetchone()
+            tokens = limit.burst if row is None else _refill(row[0], now - row[1], limit)
+            wait = 0.0 if tokens >= 1 else (1 - tokens) / limit.rate
+            if not wait:
+                tokens -= 1
+            conn.execute('INSERT OR REPLACE INTO throttle_buckets VALUES (?, ?, ?)', (key, tokens, now))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if next(self._calls) % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM throttle_buckets WHERE updated < ?', (now - self.idle_s,))
+        return wait
+
+    def give(self, key: str, limit: Limit) -> None:
+        """Return a token spent by an attempt that turned out legitimate"""
+        self._conn().execute('UPDATE throttle_buckets SET tokens = min(?, tokens + 1) WHERE key = ?',
+                             (limit.burst, key))
+
+    def __len__(self) -> int:
+        return self._conn().execute('SELECT count(*) FROM throttle_buckets').fetchone()[0]
+
+def create_store():
+    if THROTTLE_STORE_PATH:
+        return SharedBucketStore(THROTTLE_STORE_PATH, max(IP_LIMIT.refill_s, ACCOUNT_LIMIT.refill_s))
+    return MemoryBucketStore()
+
+bucket_store = create_store()
+
+def client_ip() -> str:
+    """Peer address, or the X-Forwarded-For entry added by the outermost trusted proxy"""
+    if THROTTLE_PROXY_HOPS:
+        forwarded = [part.strip() for part in request.headers.get('X-Forwarded-For', '').split(',') if part.strip()]
+        if len(forwarded) >= THROTTLE_PROXY_HOPS:
+            return forwarded[-THROTTLE_PROXY_HOPS]
+    return request.remote_addr or 'unknown'
+
+def _account(data) -> Optional[str]:
+    email = data.get('email') if isinstance(data, dict) else None
+    return f'account:{normalize_email(email)}' if isinstance(email, str) and email.strip() else None
+
+def _limited(scope: str, wait: float):
+    metrics.inc('throttle_requests', scope=scope, result='limited')
+    response = RATE_LIMITED()
+    response.headers['Retry-After'] = str(max(1, math.ceil(wait)))
+    return response
+
+def _take(key: str, limit: Limit) -> float:
+    try:
+        return bucket_store.take(key, limit)
+    except sqlite3.Error as e:
+        # A busy or broken shared file must not lock everyone out
+        metrics.inc('throttle_errors')
+        logger.warning('Throttle store unavailable, allowing request: %s', e)
+        return 0.0
+
+def throttled(f):
+    """Charge the client IP and the email in the JSON body one token each before running the view"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not THROTTLE_ENABLED:
+            return f(*args, **kwargs)
+        wait = _take(f'ip:{client_ip()}', IP_LIMIT)
+        if wait:
+            return _limited('ip', wait)
+        account = _account(request.get_json(silent=True))
+        if account is not None:
+            wait = _take(account, ACCOUNT_LIMIT)
+            if wait:
+                return _limited('account', wait)
+        metrics.inc('throttle_requests', scope='all', result='allowed')
+
+        response = make_response(f(*args, **kwargs))
+        if account is not None and response.status_code < 400:
+            # Successful sign-ins do not count against the account, only failures do
+            try:
+                bucket_store.give(account, ACCOUNT_LIMIT)
+            except sqlite3.Error:
+                pass
+        return response
+
+    return decorated
+
+metrics.register('throttle_buckets', lambda: len(bucket_store))
@@ -0,0 +1,145 @@
+"""
+Space Explorer per-user marks shared by a host's workers
+Timestamps keyed by user id and kind that every worker process on the host
+sees. Read-your-writes pins, cache invalidations and deactivations are stored
+here, so they hold whichever worker serves the next request. They live in a
+SQLite file in WAL mode, like the throttle's shared buckets, or in the process
+when USER_MARKS_PATH is empty.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from itertools import count
+from typing import Dict, List, Optional, Tuple
+
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# SQLite file shared by the workers of one host; empty keeps marks per process
+USER_MARKS_PATH = os.getenv('USER_MARKS_PATH', os.path.join(tempfile.gettempdir(), 'space-explorer-user-marks.db'))
+# Marks older than this are pruned; keep it above every window and cache TTL that reads them
+USER_MARKS_RETENTION_S = float(os.getenv('USER_MARKS_RETENTION_S', '3600'))
+
+class MemoryMarks:
+    """Marks of this process only"""
+    backend = 'memory'
+    PRUNE_EVERY = 1000
+
+    def __init__(self, retention_s: float = USER_MARKS_RETENTION_S):
+        self.retention_s = retention_s
+        self._marks: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.Lock()
+        self._calls = count(1)
+
+    def set(self, user_id: str, kind: str, at: float) -> None:
+        with self._lock:
+            self._marks[(user_id, kind)] = at
+            if next(self._calls) % self.PRUNE_EVERY == 0:
+                cutoff = time.time() - self.retention_s
+                for key in [key for key, value in self._marks.items() if value < cutoff]:
+                    del self._marks[key]
+
+    def get(self, user_id: str, kind: str) -> Optional[float]:
+        return self._marks.get((user_id, kind))
+
+    def since(self, kind: str, after: float) -> List[Tuple[str, float]]:
+        with self._lock:
+            return [(user_id, at) for (user_id, mark), at in self._marks.items() if mark == kind and at > after]
+
+    def __len__(self) -> int:
+        return len(self._marks)
+
+class SharedMarks:
+    """Marks in a SQLite file, written and read by every worker on the host"""
+    backend = 'sqlite'
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: str, retention_s: float = USER_MARKS_RETENTION_S):
+        self.path = path
+        self.retention_s = retention_s
+        self._local = threading.local()
+        self._calls = count(1)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=OFF')
+            conn.execute('CREATE TABLE IF NOT EXISTS user_marks (user_id TEXT NOT NULL, kind TEXT NOT NULL, '
+                         'at REAL NOT NULL, PRIMARY KEY (user_id, kind)) WITHOUT ROWID')
+            conn.execute('CREATE INDEX IF NOT EXISTS user_marks_kind_at ON user_marks (kind, at)')
+            self._local.conn = conn
+        return conn
+
+    def set(self, user_id: str, kind: str, at: float) -> None:
+        conn = self._conn()
+        conn.execute('INSERT OR REPLACE INTO user_marks VALUES (?, ?, ?)', (user_id, kind, at))
+        if next(self._calls) % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM user_marks WHERE at < ?', (time.time() - self.retention_s,))
+
+    def get(self, user_id: str, kind: str) -> Optional[float]:
+        row = self._conn().execute('SELECT at FROM user_marks WHERE user_id = ? AND kind = ?',
+                                   (user_id, kind)).fetchone()
+        return row[0] if row else None
+
+    def since(self, kind: str, after: float) -> List[Tuple[str, float]]:
+        return self._conn().execute('SELECT user_id, at FROM user_marks WHERE kind = ? AND at > ?',
+                                    (kind, after)).fetchall()
+
+    def __len__(self) -> int:
+        return self._conn().execute('SELECT count(*) FROM user_marks').fetchone()[0]
+
+class UserMarks:
+    """Store front that never lets a busy or broken shared file fail a request"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def set(self, user_id, kind: str, at: Optional[float] = None) -> None:
+        """Record a mark for a user, at now unless given"""
+        try:
+            self.store.set(str(user_id), kind, time.time() if at is None else at)
+        except sqlite3.Error as e:
+            metrics.inc('user_marks_errors', op='set')
+            logger.warning('User marks store unavailable, mark dropped: %s', e)
+
+    def get(self, user_id, kind: str) -> Optional[float]:
+        """Time of a user's mark of this kind, or None"""
+        try:
+            return self.store.get(str(user_id), kind)
+        except sqlite3.Error as e:
+            metrics.inc('user_marks_errors', op='get')
+            logger.warning('User marks store unavailable: %s', e)
+            return None
+
+    def since(self, kind: str, after: float) -> List[Tuple[str, float]]:
+        """(user id, time) of every mark of this kind newer than after"""
+        try:
+            return self.store.since(kind, after)
+        except sqlite3.Error as e:
+            metrics.inc('user_marks_errors', op='since')
+            logger.warning('User marks store unavailable: %s', e)
+            return []
+
+    @property
+    def shared(self) -> bool:
+        """Whether other worker processes see these marks"""
+        return self.store.backend != 'memory'
+
+    def __len__(self) -> int:
+        try:
+            return len(self.store)
+        except sqlite3.Error:
+            return 0
+
+def create_marks(path: str = USER_MARKS_PATH) -> UserMarks:
+    return UserMarks(SharedMarks(path) if path else MemoryMarks())
+
+user_marks = create_marks()
+metrics.register('user_marks', lambda: len(user_marks))
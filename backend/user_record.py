@@ -0,0 +1,60 @@
+"""
+Space Explorer user record
+Compact immutable user type built once from a database row and cached/handed
+around instead of the raw dict. Never carries the password hash.
+"""
+
+from responses import dumps, loads
+
+# Public columns in the API's JSON order (same as the `me` projection)
+USER_FIELDS = ('id', 'email', 'name', 'is_active', 'created_at', 'updated_at', 'last_login', 'profile_data')
+
+class UserRecord:
+    """Read-only user row; profile_data is kept as one encoded JSON blob and decoded per read"""
+    __slots__ = ('id', 'email', 'name', 'is_active', 'created_at', 'updated_at', 'last_login',
+                 'version', '_profile_json')
+
+    def __init__(self, **fields):
+        for name in self.__slots__[:-1]:
+            object.__setattr__(self, name, fields.get(name))
+        profile_data = fields.get('profile_data')
+        object.__setattr__(self, '_profile_json', None if profile_data is None else dumps(profile_data))
+
+    @classmethod
+    def from_row(cls, row: dict) -> 'UserRecord':
+        """Convert a users row at the repository boundary, dropping the password hash"""
+        return cls(**row)
+
+    @property
+    def profile_data(self):
+        return None if self._profile_json is None else loads(self._profile_json)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def get(self, name: str, default=None):
+        """dict-style access for code shared with raw rows"""
+        value = getattr(self, name) if name in USER_FIELDS or name == 'version' else None
+        return default if value is None else value
+
+    def as_json(self) -> dict:
+        """The API's JSON shape of a user"""
+        data = {
+            'id': self.id,
+            'email': self.email,
+            'name': self.name,
+            'is_active': self.is_active,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'last_login': self.last_login,
+            'profile_data': self.profile_data
+        }
+        if self.version is not None:
+            data['version'] = self.version
+        return data
+
+    def __repr__(self) -> str:
+        return f'UserRecord(id={self.id!r}, email={self.email!r})'
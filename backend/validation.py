@@ -0,0 +1,146 @@
+"""
+Space Explorer request validation
+Declarative per-route body schemas compiled once at import into plain checks
+with pre-encoded 400 responses, so malformed requests are turned away before
+any hashing or database call
+"""
+
+import re
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from flask import request
+
+from metrics import metrics
+from passwords import BCRYPT_MAX_BYTES
+from responses import MISSING_CREDENTIALS, MISSING_FIELD, StaticResponse, static_error
+
+# Same pattern as is_valid_email() behind the users.check_valid_email constraint
+EMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+
+INVALID_BODY = static_error(400, 'Request body must be a JSON object', 'VALIDATION_ERROR')
+
+_MISSING = object()
+
+class Field:
+    """Base of the field types: whether the field must be present and what to answer when it is not"""
+
+    def __init__(self, required: bool = True, missing: Optional[StaticResponse] = None):
+        self.required = required
+        self.missing = missing
+
+    def missing_response(self, name: str) -> StaticResponse:
+        return self.missing or MISSING_FIELD.get(name) or static_error(400, f'{name} is required', 'MISSING_FIELD')
+
+    def compile(self, name: str) -> Callable[[object], Optional[StaticResponse]]:
+        raise NotImplementedError
+
+class String(Field):
+    """A string field; lengths count characters after the optional strip"""
+
+    def __init__(self, min_length: int = 1, max_length: Optional[int] = None, max_bytes: Optional[int] = None,
+                 strip: bool = False, pattern: Optional[re.Pattern] = None, format_name: str = '', **kwargs):
+        super().__init__(**kwargs)
+        self.min_length = min_length
+        self.max_length = max_length
+        self.max_bytes = max_bytes
+        self.strip = strip
+        self.pattern = pattern
+        self.format_name = format_name
+
+    def compile(self, name: str) -> Callable[[object], Optional[StaticResponse]]:
+        not_string = static_error(400, f'{name} must be a string', 'VALIDATION_ERROR')
+        limits = f'{self.min_length}-{self.max_length}' if self.max_length else f'at least {self.min_length}'
+        bad_length = static_error(400, f'{name} must be {limits} characters', 'VALIDATION_ERROR')
+        too_long = static_error(400, f'{name} must be at most {self.max_bytes} bytes', 'VALIDATION_ERROR')
+        bad_format = static_error(400, f'{name} must be a valid {self.format_name}', 'VALIDATION_ERROR')
+        # An empty required string is reported like a missing one, as the routes always did
+        empty = self.missing_response(name) if self.required else bad_length
+        min_length, max_length, max_bytes = self.min_length, self.max_length or float('inf'), self.max_bytes
+        strip, match = self.strip, self.pattern.match if self.pattern else None
+
+        def check(value):
+            if not isinstance(value, str):
+                return not_string
+            if strip:
+                value = value.strip()
+            if not value:
+                return empty
+            if not min_length <= len(value) <= max_length:
+                return bad_length
+            # Only strings that could exceed the limit in UTF-8 (4 bytes per character) get encoded
+            if max_bytes is not None and len(value) * 4 > max_bytes and len(value.encode('utf-8')) > max_bytes:
+                return too_long
+            if match is not None and match(value) is None:
+                return bad_format
+            return None
+        return check
+
+class Email(String):
+    """An email address in the format the database constraint accepts"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', 255)
+        super().__init__(strip=True, pattern=EMAIL_PATTERN, format_name='email address', **kwargs)
+
+class Object(Field):
+    """A JSON object field"""
+
+    def compile(self, name: str) -> Callable[[object], Optional[StaticResponse]]:
+        not_object = static_error(400, f'{name} must be an object', 'VALIDATION_ERROR')
+        return lambda value: None if isinstance(value, dict) else not_object
+
+class Schema:
+    """Named set of body fields, compiled to (name, required, missing response, check) tuples"""
+
+    def __init__(self, name: str, fields: Dict[str, Field]):
+        self.name = name
+        self._fields = tuple(
+            (field, spec.required, spec.missing_response(field), spec.compile(field))
+            for field, spec in fields.items()
+        )
+
+    def validate(self, data) -> Optional[StaticResponse]:
+        """The error response for a body, or None when it is valid"""
+        if not isinstance(data, dict):
+            metrics.inc('validation_rejected', schema=self.name, field='body')
+            return INVALID_BODY
+        for field, required, missing, check in self._fields:
+            value = data.get(field, _MISSING)
+            if value is _MISSING or value is None:
+                error = missing if required else None
+            else:
+                error = check(value)
+            if error is not None:
+                metrics.inc('validation_rejected', schema=self.name, field=field)
+                return error
+        return None
+
+def validated(schema: Schema):
+    """Reject a request whose JSON body does not match the schema before running the view"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            error = schema.validate(request.get_json(silent=True))
+            if error is not None:
+                return error()
+            return f(*args, **kwargs)
+        decorated.schema = schema
+        return decorated
+    return decorator
+
+# Route schemas; lengths follow the users table columns
+REGISTER = Schema('register', {
+    'name': String(max_length=100, strip=True),
+    'email': Email(),
+    'password': String(max_bytes=BCRYPT_MAX_BYTES),
+})
+LOGIN = Schema('login', {
+    'email': Email(missing=MISSING_CREDENTIALS),
+    # No byte limit: accounts registered before it existed may have longer passwords
+    'password': String(missing=MISSING_CREDENTIALS),
+})
+UPDATE_PROFILE = Schema('update_profile', {
+    'name': String(max_length=100, strip=True, required=False),
+    'profile_data': Object(required=False),
+})